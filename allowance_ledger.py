@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+from config import Config
+from utils import Logger, FileManager
+from colorama import Fore, Style
+
+MAX_UINT256 = 2**256 - 1
+
+# keccak256("Approval(address,address,uint256)")
+APPROVAL_TOPIC = '0x8c5be1e5ebec7d5bd14f71427d1e84f3dd0314c0f7b2291e5b200ac8c7c3b925'
+
+class AllowanceLedger:
+    """Локальный учет безлимитных approve по (владелец, токен, spender) с сохранением на диск"""
+
+    def __init__(self):
+        self.config = Config()
+        self.cache_file = self.config.ALLOWANCE_LEDGER_FILE
+        # "владелец:токен:spender" -> allowance
+        self.allowances = FileManager.load_json(self.cache_file, {})
+
+    @staticmethod
+    def _key(owner: str, token: str, spender: str):
+        return f"{owner.lower()}:{token.lower()}:{spender.lower()}"
+
+    def is_unlimited(self, owner: str, token: str, spender: str):
+        """Известно ли, что spender уже имеет безлимитный approve"""
+        return self.allowances.get(self._key(owner, token, spender), 0) == MAX_UINT256
+
+    def record(self, owner: str, token: str, spender: str, amount: int):
+        """Учет allowance; храним только безлимитные, остальные расходуются и быстро устаревают"""
+        key = self._key(owner, token, spender)
+        if amount == MAX_UINT256:
+            if self.allowances.get(key) != MAX_UINT256:
+                self.allowances[key] = MAX_UINT256
+                Logger.log(f"{Fore.CYAN + Style.BRIGHT}Recorded unlimited allowance: token {token[:10]}... -> spender {spender[:10]}...{Style.RESET_ALL}")
+                self.save()
+        elif key in self.allowances:
+            del self.allowances[key]
+            self.save()
+
+    def record_logs(self, receipt):
+        """Обновление по событиям Approval из квитанции"""
+        for log in receipt.get('logs', []):
+            topics = log.get('topics', [])
+            if len(topics) != 3 or self._to_hex(topics[0]) != APPROVAL_TOPIC:
+                continue
+            
+            owner = '0x' + self._to_hex(topics[1])[-40:]
+            spender = '0x' + self._to_hex(topics[2])[-40:]
+            data = self._to_hex(log.get('data', '0x'))
+            amount = int(data, 16) if len(data) > 2 else 0
+            self.record(owner, log['address'], spender, amount)
+
+    @staticmethod
+    def _to_hex(value):
+        """HexBytes/bytes/str -> hex строка с 0x в нижнем регистре"""
+        if isinstance(value, (bytes, bytearray)):
+            return '0x' + bytes(value).hex()
+        return value.lower() if value.startswith('0x') else '0x' + value.lower()
+
+    def save(self):
+        """Сохранение журнала на диск"""
+        FileManager.save_json(self.cache_file, self.allowances)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+import random
+import asyncio
+from aiohttp import ClientError
+from config import Config
+from utils import Logger
+from colorama import Fore, Style
+
+# Виды сбоев API запроса
+TRANSPORT = 'transport'  # соединение, прокси, таймаут
+SERVER = 'server'  # HTTP 5xx или нечитаемый ответ
+RATE_LIMITED = 'rate_limited'  # HTTP 429
+AUTH = 'auth'  # HTTP 401/403 - токен недействителен
+CLIENT = 'client'  # прочие HTTP 4xx - повтор не поможет
+BUSINESS = 'business'  # HTTP 200, но API вернул ошибку в теле
+
+# Повторяем только то, что может пройти со второго раза
+RETRYABLE_KINDS = {TRANSPORT, SERVER, RATE_LIMITED}
+
+class ApiError(Exception):
+    """Ошибка API запроса с указанием вида сбоя"""
+
+    def __init__(self, kind: str, message: str, status: int = None, payload=None, retryable: bool = None):
+        super().__init__(message)
+        self.kind = kind
+        self.status = status
+        self.payload = payload
+        # Имеет ли смысл повторять запрос (по умолчанию - по виду сбоя)
+        self.retryable = kind in RETRYABLE_KINDS if retryable is None else retryable
+
+class ApiClient:
+    """JSON запросы к HTTP API через общие сессии: классификация сбоев и повторы с экспоненциальной паузой"""
+
+    def __init__(self, http):
+        self.config = Config()
+        self.http = http
+
+    def backoff_delay(self, attempt: int):
+        """Пауза перед повтором attempt (0 - первый повтор): экспонента с потолком и полным джиттером"""
+        ceiling = min(self.config.API_BACKOFF_MAX, self.config.API_BACKOFF_BASE * 2 ** attempt)
+        return random.uniform(0, ceiling)
+
+    async def backoff(self, attempt: int):
+        """Ожидание перед повтором attempt"""
+        await asyncio.sleep(self.backoff_delay(attempt))
+
+    @staticmethod
+    def classify_status(status: int):
+        """Вид сбоя по HTTP статусу (None - успешный ответ)"""
+        if status == 429:
+            return RATE_LIMITED
+        if status in (401, 403):
+            return AUTH
+        if status >= 500:
+            return SERVER
+        if status >= 400:
+            return CLIENT
+        return None
+
+    async def _request_once(self, method: str, proxy, url: str, retry_if=None, **kwargs):
+        """Одна попытка: разобранный JSON ответа или ApiError"""
+        try:
+            async with self.http.request(method, proxy, url, **kwargs) as response:
+                kind = self.classify_status(response.status)
+                if kind is not None:
+                    # Тело ошибки сохраняем для диагностики
+                    body = await response.text()
+                    raise ApiError(kind, f"HTTP {response.status}: {body[:100]}", response.status, body)
+                try:
+                    result = await response.json(content_type=None)
+                except ValueError:
+                    raise ApiError(SERVER, "Invalid JSON response", response.status)
+        except (ClientError, asyncio.TimeoutError) as e:
+            raise ApiError(TRANSPORT, f"{type(e).__name__}: {str(e)[:50]}")
+
+        # Временная ошибка в теле ответа (например, "сервер занят") - повторяем
+        if retry_if is not None and retry_if(result):
+            raise ApiError(BUSINESS, f"API error: {str(result)[:100]}", response.status, result, retryable=True)
+        return result
+
+    async def request(self, method: str, proxy, url: str, retries: int = None, retry_if=None, **kwargs):
+        """JSON ответ API; повторы только для транспортных, 5xx и 429 сбоев (и ответов, для которых retry_if истинно)"""
+        if retries is None:
+            retries = self.config.API_MAX_RETRIES
+        # retries - общее число попыток; 0 значит одну попытку без повторов
+        retries = max(retries, 1)
+        for attempt in range(retries):
+            try:
+                return await self._request_once(method, proxy, url, retry_if=retry_if, **kwargs)
+            except ApiError as e:
+                if not e.retryable or attempt == retries - 1:
+                    raise
+                delay = self.backoff_delay(attempt)
+                Logger.log(f"{Fore.YELLOW + Style.BRIGHT}{method} {self.http.origin_of(url)} failed ({e.kind}: {str(e)[:50]}), retry {attempt + 1}/{retries - 1} in {delay:.1f}s{Style.RESET_ALL}")
+                await asyncio.sleep(delay)
+
+    async def get(self, proxy, url: str, **kwargs):
+        """GET запрос с повторами"""
+        return await self.request('GET', proxy, url, **kwargs)
+
+    async def post(self, proxy, url: str, **kwargs):
+        """POST запрос с повторами"""
+        return await self.request('POST', proxy, url, **kwargs)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import json
+import asyncio
+from aiohttp import ClientSession, WSMsgType
+from config import Config
+from utils import Logger
+from colorama import Fore, Style
+
+class BlockWatcher:
+    """Подписка на newHeads по WebSocket; пока подписки нет, трекер квитанций опрашивает RPC по HTTP"""
+
+    def __init__(self, url: str, receipt_tracker):
+        self.config = Config()
+        self.url = url
+        self.receipt_tracker = receipt_tracker
+        self._session = None
+        self._task = None
+
+    def start(self):
+        """Запуск фонового подключения (повторный вызов ничего не делает)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """Остановка подписки и закрытие соединения"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _run(self):
+        """Подключение с переподключением по нарастающей паузе"""
+        delay = self.config.WS_RECONNECT_DELAY
+        while True:
+            try:
+                await self._subscribe()
+                # Подписка работала и оборвалась - переподключаемся без долгой паузы
+                delay = self.config.WS_RECONNECT_DELAY
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Block subscription unavailable, polling via HTTP: {str(e)[:50]}{Style.RESET_ALL}")
+            finally:
+                self.receipt_tracker.set_subscribed(False)
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.config.WS_RECONNECT_MAX_DELAY)
+
+    async def _subscribe(self):
+        """Одна сессия подписки: eth_subscribe newHeads и передача номеров блоков трекеру"""
+        if self._session is None or self._session.closed:
+            self._session = ClientSession()
+
+        async with self._session.ws_connect(self.url, heartbeat=self.config.WS_HEAD_TIMEOUT / 2) as ws:
+            await ws.send_json({'jsonrpc': '2.0', 'id': 1, 'method': 'eth_subscribe', 'params': ['newHeads']})
+            reply = await ws.receive_json(timeout=self.config.RPC_TIMEOUT)
+            if 'error' in reply:
+                raise Exception(f"eth_subscribe failed: {reply['error']}")
+
+            Logger.log(f"{Fore.GREEN + Style.BRIGHT}Subscribed to new blocks via {self.url}{Style.RESET_ALL}")
+            self.receipt_tracker.set_subscribed(True)
+
+            while True:
+                # Долго нет блоков - подписка зависла, переходим на опрос и переподключаемся
+                message = await ws.receive(timeout=self.config.WS_HEAD_TIMEOUT)
+                if message.type != WSMsgType.TEXT:
+                    return
+
+                head = json.loads(message.data).get('params', {}).get('result')
+                if isinstance(head, dict) and head.get('number'):
+                    self.receipt_tracker.on_new_head(int(head['number'], 16))
@@ -4,8 +4,8 @@ import asyncio
 import random
 import time
 from web3 import Web3
-from eth_account import Account
 from config import Config
+from signer import WalletSigner
 from utils import Logger
 from colorama import Fore, Style
 
@@ -52,12 +52,12 @@ class BrokexManager:
             Logger.log(f"{Fore.RED + Style.BRIGHT}Error getting USDT balance: {e}{Style.RESET_ALL}")
             return 0
 
-    async def approve_usdt_for_trading(self, web3, private_key: str, amount: float):
+    async def approve_usdt_for_trading(self, web3, signer: WalletSigner, amount: float):
         """Одобрение USDT для торговых операций"""
         try:
             return await self.web3_manager.approve_token(
                 web3, 
-                private_key, 
+                signer, 
                 self.USDT_CONTRACT_ADDRESS, 
                 self.TRADE_ROUTER_ADDRESS, 
                 int(amount * 10**6)  # USDT имеет 6 decimals
@@ -66,10 +66,31 @@ class BrokexManager:
             Logger.log(f"{Fore.RED + Style.BRIGHT}USDT approval error: {e}{Style.RESET_ALL}")
             return False
 
-    async def create_trade_order(self, web3, private_key: str, pair_index: int, is_long: bool, amount_usdt: float, leverage: int = 5):
+    async def _build_trade_tx(self, web3, address: str, pair_index: int, is_long: bool, amount_usdt: float, leverage: int = 5):
+        """Транзакция создания торгового ордера"""
+        contract = self.web3_manager.get_contract(web3, self.TRADE_ROUTER_ADDRESS, self.ORDER_CONTRACT_ABI)
+
+        # Параметры ордера
+        amount_wei = int(amount_usdt * 10**6)  # USDT 6 decimals
+        
+        return await contract.functions.createPendingOrder(
+            pair_index,      # assetIndex
+            is_long,         # isLong
+            amount_wei,      # usdSize
+            leverage,        # leverage
+            0,               # slPrice (0 = no stop loss)
+            0                # tpPrice (0 = no take profit)
+        ).build_transaction({
+            'from': address,
+            'gas': 400000,
+            **await self.web3_manager.get_fees(web3),
+            'chainId': self.config.CHAIN_ID
+        })
+
+    async def create_trade_order(self, web3, signer: WalletSigner, pair_index: int, is_long: bool, amount_usdt: float, leverage: int = 5):
         """Создание торгового ордера"""
         try:
-            account = Account.from_key(private_key)
+            account = signer.account
             
             # Проверяем баланс USDT
             usdt_balance = await self.get_usdt_balance(web3, account.address)
@@ -78,46 +99,21 @@ class BrokexManager:
                 return None
 
             # Одобряем USDT
-            approval_success = await self.approve_usdt_for_trading(web3, private_key, amount_usdt)
+            approval_success = await self.approve_usdt_for_trading(web3, signer, amount_usdt)
             if not approval_success:
                 Logger.log(f"{Fore.RED + Style.BRIGHT}Failed to approve USDT for trading{Style.RESET_ALL}")
                 return None
 
-            # Создаем контракт для торговли
-            contract = web3.eth.contract(
-                address=self.TRADE_ROUTER_ADDRESS,
-                abi=self.ORDER_CONTRACT_ABI
-            )
-
-            # Параметры ордера
-            amount_wei = int(amount_usdt * 10**6)  # USDT 6 decimals
-            
             # Создаем транзакцию
-            tx = contract.functions.createPendingOrder(
-                pair_index,      # assetIndex
-                is_long,         # isLong
-                amount_wei,      # usdSize
-                leverage,        # leverage
-                0,               # slPrice (0 = no stop loss)
-                0                # tpPrice (0 = no take profit)
-            ).build_transaction({
-                'from': account.address,
-                'gas': 400000,
-                'maxFeePerGas': web3.to_wei(2, 'gwei'),
-                'maxPriorityFeePerGas': web3.to_wei(1, 'gwei'),
-                'nonce': web3.eth.get_transaction_count(account.address, 'pending'),
-                'chainId': self.config.CHAIN_ID
-            })
+            tx = await self._build_trade_tx(web3, account.address, pair_index, is_long, amount_usdt, leverage)
 
             # Подписываем и отправляем
-            signed_tx = web3.eth.account.sign_transaction(tx, private_key)
-            raw_tx = signed_tx.raw_transaction if hasattr(signed_tx, 'raw_transaction') else signed_tx.rawTransaction
-            tx_hash = web3.eth.send_raw_transaction(raw_tx)
+            tx_hash = await self.web3_manager.send_transaction(web3, signer, tx)
 
             Logger.log(f"{Fore.GREEN + Style.BRIGHT}Trade order created! TX: {tx_hash.hex()}{Style.RESET_ALL}")
             
             # Ждем подтверждения
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=300)
+            receipt = await self.web3_manager.wait_for_receipt(web3, tx_hash, timeout=300)
             
             if receipt.status == 1:
                 Logger.log(f"{Fore.GREEN + Style.BRIGHT}Trade order confirmed! Block: #{receipt.blockNumber}{Style.RESET_ALL}")
@@ -129,14 +125,19 @@ class BrokexManager:
             Logger.log(f"{Fore.RED + Style.BRIGHT}Create trade order error: {e}{Style.RESET_ALL}")
             return None
 
-    async def execute_random_trades(self, web3, private_key: str, trade_count: int, amount_per_trade: float, min_delay: int = 10, max_delay: int = 30):
-        """Выполнение серии случайных торговых операций"""
+    async def execute_random_trades(self, web3, signer: WalletSigner, trade_count: int, amount_per_trade: float, min_delay: int = 10, max_delay: int = 30, pipelined: bool = True):
+        """Выполнение серии случайных торговых операций (pipelined - все ордера сразу, без ожидания каждого)"""
         try:
-            account = Account.from_key(private_key)
+            account = signer.account
             successful_trades = 0
             
             Logger.log(f"{Fore.CYAN + Style.BRIGHT}Starting {trade_count} random trades with {amount_per_trade} USDT each{Style.RESET_ALL}")
             
+            if pipelined:
+                successful_trades = await self._execute_trades_pipelined(web3, signer, trade_count, amount_per_trade)
+                Logger.log(f"{Fore.GREEN + Style.BRIGHT}Trading session completed: {successful_trades}/{trade_count} successful trades{Style.RESET_ALL}")
+                return successful_trades
+            
             for i in range(trade_count):
                 # Выбираем случайную пару и направление
                 pair = random.choice(self.trading_pairs)
@@ -159,7 +160,7 @@ class BrokexManager:
                 # Создаем ордер
                 tx_hash = await self.create_trade_order(
                     web3, 
-                    private_key, 
+                    signer, 
                     pair_index, 
                     is_long, 
                     amount_per_trade
@@ -184,11 +185,49 @@ class BrokexManager:
             Logger.log(f"{Fore.RED + Style.BRIGHT}Execute trades error: {e}{Style.RESET_ALL}")
             return 0
 
+    async def _execute_trades_pipelined(self, web3, signer: WalletSigner, trade_count: int, amount_per_trade: float):
+        """Одна проверка баланса и approve на всю серию, затем все ордера подряд идущими nonce"""
+        account = signer.account
+        
+        usdt_balance = await self.get_usdt_balance(web3, account.address)
+        Logger.log(f"{Fore.CYAN + Style.BRIGHT}USDT Balance: {usdt_balance:.6f}{Style.RESET_ALL}")
+        
+        affordable = min(trade_count, int(usdt_balance // amount_per_trade)) if amount_per_trade > 0 else trade_count
+        if affordable < trade_count:
+            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Balance covers only {affordable}/{trade_count} trades{Style.RESET_ALL}")
+        if affordable == 0:
+            return 0
+        
+        if not await self.approve_usdt_for_trading(web3, signer, amount_per_trade * affordable):
+            Logger.log(f"{Fore.RED + Style.BRIGHT}Failed to approve USDT for trading{Style.RESET_ALL}")
+            return 0
+        
+        orders = []
+        for i in range(affordable):
+            pair = random.choice(self.trading_pairs)
+            is_long = random.choice([True, False])
+            direction = "LONG" if is_long else "SHORT"
+            Logger.log(f"{Fore.MAGENTA + Style.BRIGHT}Trade {i+1}/{trade_count}: {direction} {pair['name']}{Style.RESET_ALL}")
+            orders.append(await self._build_trade_tx(web3, account.address, pair["index"], is_long, amount_per_trade))
+        
+        results = await self.web3_manager.send_transactions(web3, signer, orders)
+        
+        successful_trades = 0
+        for i, result in enumerate(results):
+            if result['status'] == 'confirmed':
+                successful_trades += 1
+                Logger.log(f"{Fore.GREEN + Style.BRIGHT}✅ Trade {i+1} successful: {result['tx_hash'].hex()} | Block: #{result['block']}{Style.RESET_ALL}")
+            else:
+                error = f": {str(result['error'])[:80]}" if result['error'] else ""
+                Logger.log(f"{Fore.RED + Style.BRIGHT}❌ Trade {i+1} {result['status']}{error}{Style.RESET_ALL}")
+        return successful_trades
+
     async def get_trading_info(self, web3, address: str):
         """Получение информации для торговли"""
         try:
-            usdt_balance = await self.get_usdt_balance(web3, address)
-            phrs_balance = await self.web3_manager.get_token_balance(web3, address, "PHRS")
+            balances = await self.web3_manager.get_token_balances(web3, address, [self.USDT_CONTRACT_ADDRESS, "PHRS"])
+            usdt_balance = balances[self.USDT_CONTRACT_ADDRESS]
+            phrs_balance = balances["PHRS"]
             
             return {
                 "usdt_balance": usdt_balance,
@@ -199,10 +238,10 @@ class BrokexManager:
             Logger.log(f"{Fore.RED + Style.BRIGHT}Get trading info error: {e}{Style.RESET_ALL}")
             return None
 
-    async def simulate_day_trading(self, web3, private_key: str, total_budget_usdt: float, trades_per_session: int = 5):
+    async def simulate_day_trading(self, web3, signer: WalletSigner, total_budget_usdt: float, trades_per_session: int = 5):
         """Симуляция дневной торговли с управлением рисками"""
         try:
-            account = Account.from_key(private_key)
+            account = signer.account
             
             # Разделяем бюджет на количество сделок
             amount_per_trade = total_budget_usdt / trades_per_session
@@ -215,7 +254,7 @@ class BrokexManager:
             # Выполняем торговые операции
             successful_trades = await self.execute_random_trades(
                 web3, 
-                private_key, 
+                signer, 
                 trades_per_session, 
                 amount_per_trade,
                 min_delay=15,  # Минимум 15 секунд между сделками
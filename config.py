@@ -6,8 +6,114 @@ class Config:
     # API и RPC настройки
     BASE_API = "https://api.pharosnetwork.xyz"
     RPC_URL = "https://testnet.dplabs-internal.com"
+    # Ключ RPC Pharos testnet от ZAN (https://zan.top) - второй эндпоинт пула для переключения при сбоях
+    ZAN_API_KEY = ""
+    # Пул RPC эндпоинтов: запросы идут на самый быстрый здоровый, чтения повторяются на следующем
+    # (добавьте сюда дополнительные RPC Pharos testnet, если они у вас есть; с одним эндпоинтом переключения нет)
+    RPC_URLS = [
+        RPC_URL,
+    ] + ([f"https://api.zan.top/node/v1/pharos/testnet/{ZAN_API_KEY}"] if ZAN_API_KEY else [])
     CHAIN_ID = 688688
     
+    # Параметры RPC подключений
+    RPC_TIMEOUT = 30  # секунд на один запрос
+    RPC_HEALTH_CHECK_INTERVAL = 60  # проверка подключения не чаще раза в минуту
+    RPC_CONNECTION_LIMIT = 100  # максимум одновременных соединений на одну сессию
+    RPC_STATS_ALPHA = 0.2  # вес нового замера в скользящей статистике эндпоинта
+    RPC_MAX_CONSECUTIVE_ERRORS = 3  # ошибок подряд до временного отключения эндпоинта
+    RPC_ENDPOINT_COOLDOWN = 30  # секунд вне ротации после серии ошибок
+    RPC_BATCH_MAX_SIZE = 50  # максимум чтений в одном JSON-RPC батче (1 - без батчинга)
+    RPC_BATCH_WINDOW = 0  # секунд ожидания попутных чтений (0 - в пределах одного тика)
+    RPC_CACHE_TTL = {  # секунд жизни кэша для значений, которые меняются не чаще раза в блок
+        'eth_chainId': 3600,
+        'net_version': 3600,
+        'eth_getCode': 60,
+        'eth_blockNumber': 1,
+        'eth_gasPrice': 1,
+        'eth_maxPriorityFeePerGas': 1
+    }
+    
+    # Общие HTTP сессии (одна на пару прокси + хост)
+    HTTP_TIMEOUT = 30  # секунд на запрос по умолчанию
+    HTTP_CONNECTION_LIMIT = 20  # максимум одновременных соединений на одну сессию
+    HTTP_KEEPALIVE_TIMEOUT = 60  # секунд жизни простаивающего соединения
+    HTTP_DNS_CACHE_TTL = 300  # секунд кэширования DNS
+    
+    # Повторы запросов к HTTP API (экспоненциальная пауза с джиттером)
+    API_MAX_RETRIES = 5  # попыток по умолчанию
+    API_BACKOFF_BASE = 1  # секунд - потолок паузы перед первым повтором, удваивается
+    API_BACKOFF_MAX = 30  # секунд - максимальный потолок паузы
+    
+    # Ограничение частоты запросов (token bucket на хост)
+    RATE_LIMITS = {
+        'default': {'rate': 25, 'burst': 50},  # RPC эндпоинты и прочие хосты
+        'api.pharosnetwork.xyz': {'rate': 5, 'burst': 10},
+        'api.dodoex.io': {'rate': 2, 'burst': 4},
+        'api.aquaflux.pro': {'rate': 5, 'burst': 10}
+    }
+    RATE_LIMIT_MIN_RATE = 0.5  # запросов в секунду после серии 429
+    RATE_LIMIT_RECOVERY = 0.02  # доля максимальной скорости, возвращаемая за каждый успешный ответ
+    RATE_LIMIT_DEFAULT_BACKOFF = 5  # секунд паузы на 429 без заголовка Retry-After
+    
+    # Локальный учет nonce
+    NONCE_RESYNC_INTERVAL = 60  # секунд между проверками выпавших транзакций
+    
+    # Оракул комиссий (eth_feeHistory)
+    FEE_HISTORY_BLOCKS = 10  # блоков истории для оценки priority fee
+    FEE_CACHE_TTL = 2  # секунд жизни оценки, если номер нового блока неизвестен
+    FEE_MIN_PRIORITY_GWEI = 0.01  # нижняя граница priority fee
+    FEE_FALLBACK_MAX_GWEI = 2  # комиссии на случай недоступности eth_feeHistory
+    FEE_FALLBACK_PRIORITY_GWEI = 1
+    FEE_REPLACEMENT_BUMP = 1.125  # минимальное повышение комиссий для замены транзакции
+    FEE_TIERS = {
+        'slow': {'percentile': 25, 'base_fee_multiplier': 1.25},
+        'normal': {'percentile': 50, 'base_fee_multiplier': 2},
+        'fast': {'percentile': 75, 'base_fee_multiplier': 2.5}
+    }
+    
+    # Отслеживание квитанций
+    RECEIPT_POLL_INTERVAL = 1  # секунд между проверками номера блока
+    
+    # Замена зависших транзакций (тот же nonce, повышенные комиссии)
+    TX_REPLACE_AFTER_BLOCKS = 15  # блоков без подтверждения до очередной замены
+    TX_MAX_REPLACEMENTS = 3  # замен до отмены (перевод 0 PHRS самому себе)
+    RECEIPT_TRACKER_PROXY = None  # прокси общего опроса квитанций всех кошельков (None - прямое подключение)
+    TX_SETTLE_TIMEOUT = 900  # сколько сопровождать в фоне транзакцию, которую вызывающий перестал ждать, секунды
+    
+    # Подписка на новые блоки по WebSocket (пустая строка - только опрос по HTTP)
+    RPC_WS_URL = ""  # например "wss://testnet.dplabs-internal.com"
+    WS_HEAD_TIMEOUT = 30  # секунд без нового блока до переподключения (на это время - опрос)
+    WS_RECONNECT_DELAY = 5  # начальная пауза переподключения, удваивается при неудачах
+    WS_RECONNECT_MAX_DELAY = 60
+    
+    # Профили газа по (контракт, селектор)
+    GAS_PROFILES_FILE = 'gas_profiles.json'
+    GAS_LIMIT_MARGIN = 1.2  # запас над максимальным наблюдаемым расходом
+    GAS_OUT_OF_GAS_RATIO = 0.95  # откат с расходом не ниже этой доли лимита считаем нехваткой газа
+    GAS_OUT_OF_GAS_BUMP = 1.5  # во сколько раз поднять профиль после нехватки газа
+    
+    # Журнал безлимитных approve
+    ALLOWANCE_LEDGER_FILE = 'allowances.json'
+    
+    # Токены доступа к веб API Pharos (JWT): переиспользуются до истечения срока
+    TOKEN_STORE_FILE = 'tokens.json'
+    TOKEN_DEFAULT_TTL = 6 * 3600  # срок, если в токене нет поля exp
+    TOKEN_EXPIRY_MARGIN = 300  # запас до истечения, секунды
+    
+    # Подписи постоянных сообщений (логин Pharos): шифруются ключом кошелька, '' - только в памяти
+    SIGNATURE_CACHE_FILE = 'signatures.json'
+    
+    # Запасные эндпоинты веб API: рабочий запоминается, неизвестные опрашиваются с хеджированием (кроме клейма и чекина)
+    ENDPOINT_MEMORY_FILE = 'endpoints.json'
+    ENDPOINT_MEMORY_TTL = 6 * 3600  # сколько помнить рабочий или отказавший эндпоинт, секунды
+    ENDPOINT_HEDGE_DELAY = 3  # ожидание ответа до запуска следующего эндпоинта, секунды
+    
+    # Подпись транзакций
+    SIGNER_PROCESS_WORKERS = 0  # процессов для подписи (0 - подпись в основном процессе)
+    
+    # Предварительная симуляция транзакций через eth_call на состоянии pending
+    PREFLIGHT_SIMULATION = True
+    
     # Основные контракты PHAROS
     WPHRS_CONTRACT = Web3.to_checksum_address("0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE")
     USDC_CONTRACT = Web3.to_checksum_address("0x72df0bcd7276f2dfbac900d1ce63c272c4bccced")
@@ -26,6 +132,8 @@ class Config:
         'S': Web3.to_checksum_address('0x5df839de5e5a68ffe83b89d430dc45b1c5746851'),
         'CS': Web3.to_checksum_address('0xceb29754c54b4bfbf83882cb0dcef727a259d60a')
     }
+    # Минимальный остаток срока подписи минта, заранее полученной во время claim/craft, секунды
+    AQUAFLUX_SIGNATURE_MIN_TTL = 60
     
     # НОВЫЕ КОНТРАКТЫ: Brokex Trading (преобразованы в checksum формат)
     BROKEX_USDT_CONTRACT = Web3.to_checksum_address("0x78ac5e2d8a78a8b8e6d10c7b7274b03c10c91cef")
@@ -44,6 +152,10 @@ class Config:
     OPENFI_DEPOSIT_ROUTER = Web3.to_checksum_address("0xa8E550710Bf113DB6A1B38472118b8d6d5176D12")
     OPENFI_SUPPLY_ROUTER = Web3.to_checksum_address("0xAd3B4E20412A097F87CD8e8d84FbBe17ac7C89e9")
     
+    # Multicall3 (стандартный адрес одинаков во всех сетях, где он развернут)
+    MULTICALL3_ADDRESS = Web3.to_checksum_address("0xcA11bde05977b3631167028862bE2a173976CA11")
+    MULTICALL_CHUNK_SIZE = 500  # максимум вызовов в одном aggregate3
+    
     # DODO и другие DEX
     DODO_ROUTER = Web3.to_checksum_address('0x73CAfc894dBfC181398264934f7Be4e482fc9d40')
     
@@ -83,6 +195,14 @@ class Config:
         "NVIDIA": {"address": Web3.to_checksum_address("0x3299cc551B2a39926Bf14144e65630e533dF6944"), "decimals": 18}
     }
     
+    # Метаданные токенов, известные заранее (остальные запрашиваются у RPC один раз и кэшируются на диске)
+    TOKEN_METADATA_FILE = 'token_metadata.json'
+    TOKEN_METADATA = {
+        USDC_CONTRACT: {"symbol": "USDC", "decimals": 6},
+        USDT_CONTRACT: {"symbol": "USDT", "decimals": 6},
+        BROKEX_USDT_CONTRACT: {"symbol": "USDT", "decimals": 6},
+    }
+    
     # ABI контрактов
     ERC20_ABI = [
         {"type":"function","name":"balanceOf","stateMutability":"view","inputs":[{"name":"owner","type":"address"}],"outputs":[{"name":"","type":"uint256"}]},
@@ -94,6 +214,22 @@ class Config:
         {"type":"function","name":"lastClaimTime","stateMutability":"view","inputs":[{"internalType":"address","name":"","type":"address"}],"outputs":[{"internalType":"uint256","name":"","type":"uint256"}]}
     ]
     
+    MULTICALL3_ABI = [
+        {"type":"function","name":"aggregate3","stateMutability":"payable","inputs":[
+            {"name":"calls","type":"tuple[]","components":[
+                {"name":"target","type":"address"},
+                {"name":"allowFailure","type":"bool"},
+                {"name":"callData","type":"bytes"}
+            ]}
+        ],"outputs":[
+            {"name":"returnData","type":"tuple[]","components":[
+                {"name":"success","type":"bool"},
+                {"name":"returnData","type":"bytes"}
+            ]}
+        ]},
+        {"type":"function","name":"getEthBalance","stateMutability":"view","inputs":[{"name":"addr","type":"address"}],"outputs":[{"name":"balance","type":"uint256"}]}
+    ]
+    
     AQUAFLUX_NFT_ABI = [
         {"type":"function","name":"claimTokens","stateMutability":"nonpayable","inputs":[],"outputs":[]},
         {"type":"function","name":"mint","stateMutability":"payable","inputs":[
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+from eth_abi import encode
+from eth_utils import to_bytes
+from web3 import AsyncWeb3
+
+class RawFunction:
+    """Предварительно подготовленный кодировщик вызова по явному селектору"""
+
+    def __init__(self, selector: str, types: tuple):
+        self.selector = to_bytes(hexstr=selector)
+        self.types = list(types)
+
+    def encode(self, args: list):
+        """Calldata в hex формате: селектор + ABI-кодированные аргументы"""
+        return '0x' + (self.selector + encode(self.types, args)).hex()
+
+class BoundFunctions:
+    """Функции контракта-шаблона; каждый вызов уходит через подключение кошелька"""
+
+    def __init__(self, functions, web3):
+        self._functions = functions
+        self._web3 = web3
+
+    def __getattr__(self, name: str):
+        function = getattr(self._functions, name)
+
+        def bind(*args, **kwargs):
+            # Вызов функции - уже отдельная копия, подключение меняется только у нее
+            call = function(*args, **kwargs)
+            call.w3 = self._web3
+            return call
+        return bind
+
+class BoundContract:
+    """Контракт-шаблон, привязанный к подключению кошелька (привязка - обертка, ABI заново не разбирается)"""
+
+    def __init__(self, contract, web3):
+        self.address = contract.address
+        self.abi = contract.abi
+        self.w3 = web3
+        self.functions = BoundFunctions(contract.functions, web3)
+
+class ContractRegistry:
+    """Кэш контрактных привязок и кодировщиков вызовов, общий для всех кошельков и подключений"""
+
+    def __init__(self):
+        # Шаблоны строятся без привязки к прокси: запросы через них не уходят
+        self._web3 = AsyncWeb3()
+        # (address, id(abi)) -> (abi, экземпляр контракта-шаблона); abi храним, чтобы его id не переиспользовался
+        self._contracts = {}
+        # (selector, types) -> RawFunction
+        self._raw_functions = {}
+
+    def get_contract(self, web3, address: str, abi: list):
+        """Привязка контракта к подключению; ABI разбирается один раз на адрес"""
+        key = (address.lower(), id(abi))
+        entry = self._contracts.get(key)
+        if entry is None:
+            entry = (abi, self._web3.eth.contract(address=AsyncWeb3.to_checksum_address(address), abi=abi))
+            self._contracts[key] = entry
+        return BoundContract(entry[1], web3)
+
+    def get_raw_function(self, selector: str, types: list):
+        """Кодировщик вызова для функции с явным селектором (не из ABI)"""
+        key = (selector.lower(), tuple(types))
+        function = self._raw_functions.get(key)
+        if function is None:
+            function = RawFunction(selector, key[1])
+            self._raw_functions[key] = function
+        return function
+
+    def encode_raw_call(self, selector: str, types: list, args: list):
+        """Calldata для вызова по явному селектору"""
+        return self.get_raw_function(selector, types).encode(args)
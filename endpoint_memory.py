@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+import time
+import asyncio
+from config import Config
+from api_client import ApiError, AUTH, RATE_LIMITED, BUSINESS, SERVER
+from utils import Logger, FileManager
+from colorama import Fore, Style
+
+# Ответ сервера, который окончателен для всей группы: эндпоинт жив, перебор бессмысленен
+DECISIVE_KINDS = {AUTH, RATE_LIMITED}
+
+class EndpointMemory:
+    """Память о рабочих эндпоинтах из запасных списков: известный рабочий - первым, остальные - с хеджированием (для идемпотентных запросов)"""
+
+    def __init__(self):
+        self.config = Config()
+        self.cache_file = self.config.ENDPOINT_MEMORY_FILE
+        # группа -> {"good": url, "good_until": unix время, "dead": {url: unix время}}
+        self.groups = FileManager.load_json(self.cache_file, {})
+
+    def order(self, group: str, endpoints: list):
+        """Порядок опроса: известный рабочий, неизвестные (в исходном порядке), недавно отказавшие"""
+        now = time.time()
+        state = self.groups.get(group, {})
+        good = state.get('good') if state.get('good_until', 0) > now else None
+        dead = {url for url, until in state.get('dead', {}).items() if until > now}
+
+        known = [url for url in endpoints if url == good]
+        unknown = [url for url in endpoints if url != good and url not in dead]
+        failed = [url for url in endpoints if url != good and url in dead]
+        return known + unknown + failed
+
+    def mark_good(self, group: str, endpoint: str):
+        """Эндпоинт ответил - запоминаем на ENDPOINT_MEMORY_TTL"""
+        state = self.groups.setdefault(group, {})
+        state.get('dead', {}).pop(endpoint, None)
+        state['good'] = endpoint
+        state['good_until'] = int(time.time()) + self.config.ENDPOINT_MEMORY_TTL
+        self.save()
+
+    def mark_dead(self, group: str, endpoint: str):
+        """Эндпоинт недоступен - в следующий раз опрашивается последним"""
+        state = self.groups.setdefault(group, {})
+        if state.get('good') == endpoint:
+            state.pop('good', None)
+            state.pop('good_until', None)
+        state.setdefault('dead', {})[endpoint] = int(time.time()) + self.config.ENDPOINT_MEMORY_TTL
+        self.save()
+
+    def save(self):
+        """Сохранение памяти эндпоинтов на диск"""
+        FileManager.save_json(self.cache_file, self.groups)
+
+    async def request(self, group: str, endpoints: list, call, hedge: bool = True):
+        """(эндпоинт, результат) первого успешного call(endpoint); отказ call сообщает через ApiError"""
+        # С hedge следующий эндпоинт стартует, если текущие не ответили за ENDPOINT_HEDGE_DELAY или отказали;
+        # без него (неидемпотентные запросы: клейм, чекин) - строго по одному, только после отказа.
+        # ApiError вида business - эндпоинт жив, но ответ не подошел (в мертвые не записывается)
+        queue = self.order(group, endpoints)
+        pending = {}  # задача -> эндпоинт
+        last_error = None
+        launch = True
+        try:
+            while queue or pending:
+                if queue and launch:
+                    endpoint = queue.pop(0)
+                    pending[asyncio.ensure_future(call(endpoint))] = endpoint
+
+                done, _ = await asyncio.wait(
+                    pending, timeout=self.config.ENDPOINT_HEDGE_DELAY if queue and hedge else None, return_when=asyncio.FIRST_COMPLETED
+                )
+                # Никто не ответил вовремя или был отказ - подключаем следующий эндпоинт
+                launch = not done
+
+                for task in done:
+                    endpoint = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except ApiError as e:
+                        if e.kind in DECISIVE_KINDS:
+                            self.mark_good(group, endpoint)
+                            raise
+                        if e.kind != BUSINESS:
+                            self.mark_dead(group, endpoint)
+                        Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Endpoint {endpoint} failed ({e.kind}): {str(e)[:50]}...{Style.RESET_ALL}")
+                        last_error = e
+                        launch = True
+                        continue
+                    except Exception as e:
+                        # Неразборчивый ответ (ошибка в обработке результата) - такой же отказ эндпоинта
+                        self.mark_dead(group, endpoint)
+                        Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Endpoint {endpoint} failed: {type(e).__name__}: {str(e)[:50]}{Style.RESET_ALL}")
+                        last_error = ApiError(SERVER, f"{type(e).__name__}: {str(e)[:100]}")
+                        launch = True
+                        continue
+
+                    self.mark_good(group, endpoint)
+                    return endpoint, result
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise last_error or ApiError(BUSINESS, f"No endpoints for {group}")
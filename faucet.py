@@ -1,23 +1,27 @@
 #!/usr/bin/env python3
 
 import time
-import asyncio
 from datetime import datetime, timedelta
 import pytz
 from web3 import Web3
-from eth_account import Account
 from eth_account.messages import encode_defunct
 from eth_utils import to_hex
-from aiohttp import ClientSession, ClientTimeout
-from aiohttp_proxy import ProxyConnector
 from config import Config
+from api_client import ApiError, RATE_LIMITED, AUTH, BUSINESS
+from endpoint_memory import EndpointMemory
+from signer import WalletSigner
 from utils import Logger, get_headers
 from colorama import Fore, Style
 
+# Ключ токена API авторизации Pharos в хранилище токенов
+TOKEN_SCOPE = 'pharos_auth'
+
 class FaucetManager:
     def __init__(self, web3_manager):
         self.config = Config()
         self.web3_manager = web3_manager
+        # Какой из запасных эндпоинтов отвечает (общая память для всех кошельков)
+        self.endpoints = EndpointMemory()
 
     async def check_phrs_balance(self, web3, address: str):
         """Проверка баланса PHRS и рекомендации"""
@@ -42,14 +46,14 @@ class FaucetManager:
             Logger.log(f"{Fore.RED + Style.BRIGHT}Balance check error: {e}{Style.RESET_ALL}")
             return False
 
-    async def try_contract_faucet(self, web3, private_key: str):
+    async def try_contract_faucet(self, web3, signer: WalletSigner):
         """Попытка использовать контракт крана (если он работает)"""
         try:
-            account = Account.from_key(private_key)
+            account = signer.account
             
             # Проверяем, существует ли контракт
             try:
-                code = web3.eth.get_code(self.config.FAUCET_CONTRACT)
+                code = await web3.eth.get_code(self.config.FAUCET_CONTRACT)
                 if code == '0x':
                     Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Faucet contract not deployed or inactive{Style.RESET_ALL}")
                     return "not_available"
@@ -58,14 +62,11 @@ class FaucetManager:
                 return "not_available"
             
             # Пробуем вызвать контракт с минимальным газом
-            contract = web3.eth.contract(
-                address=self.config.FAUCET_CONTRACT,
-                abi=self.config.ERC20_ABI
-            )
+            contract = self.web3_manager.get_contract(web3, self.config.FAUCET_CONTRACT, self.config.ERC20_ABI)
             
             # Проверяем, можем ли мы клеймить
             try:
-                has_claimed = contract.functions.hasClaimed(account.address).call()
+                has_claimed = await contract.functions.hasClaimed(account.address).call()
                 if has_claimed:
                     Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Already claimed from contract faucet{Style.RESET_ALL}")
                     return "already_claimed"
@@ -74,23 +75,18 @@ class FaucetManager:
                 pass
             
             # Пробуем клеймить
-            tx = contract.functions.claim().build_transaction({
+            tx = await contract.functions.claim().build_transaction({
                 'from': account.address,
                 'gas': 150000,
-                'maxFeePerGas': web3.to_wei(1, 'gwei'),
-                'maxPriorityFeePerGas': web3.to_wei(0.5, 'gwei'),
-                'nonce': web3.eth.get_transaction_count(account.address, 'pending'),
+                **await self.web3_manager.get_fees(web3, 'slow'),
                 'chainId': self.config.CHAIN_ID
             })
             
-            signed_tx = web3.eth.account.sign_transaction(tx, private_key)
-            raw_tx = signed_tx.raw_transaction if hasattr(signed_tx, 'raw_transaction') else signed_tx.rawTransaction
-            
-            tx_hash = web3.eth.send_raw_transaction(raw_tx)
+            tx_hash = await self.web3_manager.send_transaction(web3, signer, tx)
             Logger.log(f"{Fore.CYAN + Style.BRIGHT}Faucet claim sent, waiting for confirmation...{Style.RESET_ALL}")
             
             try:
-                receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=60)
+                receipt = await self.web3_manager.wait_for_receipt(web3, tx_hash, timeout=60)
                 if receipt.status == 1:
                     Logger.log(f"{Fore.GREEN + Style.BRIGHT}Contract faucet claimed! TX: {tx_hash.hex()}{Style.RESET_ALL}")
                     return tx_hash.hex()
@@ -113,7 +109,7 @@ class FaucetManager:
                 Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Contract faucet not available: {str(e)[:100]}...{Style.RESET_ALL}")
                 return "not_available"
 
-    async def try_web_faucet(self, address: str, private_key: str, proxy=None):
+    async def try_web_faucet(self, address: str, signer: WalletSigner, proxy=None):
         """Попытка использовать веб-фаусет через API"""
         try:
             faucet_endpoints = [
@@ -127,7 +123,7 @@ class FaucetManager:
             message = f"Faucet claim for {address} at {timestamp}"
             
             encoded_message = encode_defunct(text=message)
-            signed_message = Account.sign_message(encoded_message, private_key=private_key)
+            signed_message = signer.sign_message(encoded_message)
             signature = to_hex(signed_message.signature)
             
             headers = get_headers()
@@ -142,53 +138,45 @@ class FaucetManager:
                 'signature': signature
             }
             
-            connector = ProxyConnector.from_url(proxy) if proxy else None
+            async def claim(endpoint):
+                result = await self.web3_manager.api.post(proxy, endpoint, json=payload, headers=headers)
+                if not (result.get('success') or result.get('status') == 'success'):
+                    raise ApiError(BUSINESS, f"Web faucet response: {result}", payload=result)
+                return result
             
-            for endpoint in faucet_endpoints:
-                try:
-                    async with ClientSession(connector=connector, timeout=ClientTimeout(total=30)) as session:
-                        async with session.post(endpoint, json=payload, headers=headers) as response:
-                            if response.status == 200:
-                                result = await response.json()
-                                if result.get('success') or result.get('status') == 'success':
-                                    Logger.log(f"{Fore.GREEN + Style.BRIGHT}Web faucet claim successful!{Style.RESET_ALL}")
-                                    return True
-                                else:
-                                    Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Web faucet response: {result}{Style.RESET_ALL}")
-                            elif response.status == 429:
-                                Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Faucet rate limited, try again later{Style.RESET_ALL}")
-                                return "rate_limited"
-                            else:
-                                Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Faucet endpoint {endpoint} returned {response.status}{Style.RESET_ALL}")
-                                
-                except Exception as e:
-                    Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Faucet endpoint {endpoint} failed: {str(e)[:50]}...{Style.RESET_ALL}")
-                    continue
+            try:
+                await self.endpoints.request('faucet', faucet_endpoints, claim, hedge=False)
+            except ApiError as e:
+                if e.kind == RATE_LIMITED:
+                    Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Faucet rate limited, try again later{Style.RESET_ALL}")
+                    return "rate_limited"
+                Logger.log(f"{Fore.YELLOW + Style.BRIGHT}All web faucet endpoints failed{Style.RESET_ALL}")
+                return None
             
-            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}All web faucet endpoints failed{Style.RESET_ALL}")
-            return None
+            Logger.log(f"{Fore.GREEN + Style.BRIGHT}Web faucet claim successful!{Style.RESET_ALL}")
+            return True
             
         except Exception as e:
             Logger.log(f"{Fore.RED + Style.BRIGHT}Web faucet error: {e}{Style.RESET_ALL}")
             return None
 
-    async def claim_faucet(self, web3, private_key: str, proxy=None):
+    async def claim_faucet(self, web3, signer: WalletSigner, proxy=None):
         """Основная функция клейма фаусета с несколькими методами"""
         try:
-            account = Account.from_key(private_key)
+            account = signer.account
             
             balance_ok = await self.check_phrs_balance(web3, account.address)
             
             Logger.log(f"{Fore.CYAN + Style.BRIGHT}Trying faucet methods...{Style.RESET_ALL}")
             
             Logger.log(f"{Fore.CYAN + Style.BRIGHT}Method 1: Contract faucet{Style.RESET_ALL}")
-            contract_result = await self.try_contract_faucet(web3, private_key)
+            contract_result = await self.try_contract_faucet(web3, signer)
             
             if contract_result and contract_result not in ["not_available", "insufficient_funds"]:
                 return contract_result
             
             Logger.log(f"{Fore.CYAN + Style.BRIGHT}Method 2: Web faucet{Style.RESET_ALL}")
-            web_result = await self.try_web_faucet(account.address, private_key, proxy)
+            web_result = await self.try_web_faucet(account.address, signer, proxy)
             
             if web_result and web_result != "rate_limited":
                 return web_result
@@ -224,201 +212,192 @@ class FaucetManager:
         else:
             return f"{secs}s"
 
-    async def get_checkin_status(self, address: str, private_key: str, proxy=None, force_check=False):
+    async def _web_login(self, address: str, message: str, signature: str, proxy=None):
+        """Вход через первый ответивший эндпоинт авторизации; access token или None"""
+        login_endpoints = [
+            f'{self.config.BASE_API}/auth/login',
+            f'{self.config.BASE_API}/api/auth/login',
+            'https://testnet.pharosnetwork.xyz/api/auth/login'
+        ]
+        
+        async def login(login_endpoint):
+            result = await self.web3_manager.api.post(
+                proxy,
+                login_endpoint,
+                json={
+                    'address': address,
+                    'message': message,
+                    'signature': signature
+                },
+                headers=get_headers(),
+                timeout=60
+            )
+            if not result.get('success'):
+                raise ApiError(BUSINESS, f"Login failed: {result}", payload=result)
+            
+            access_token = result.get('data', {}).get('accessToken')
+            if not access_token:
+                raise ApiError(BUSINESS, "No access token received", payload=result)
+            return access_token
+        
+        try:
+            _, access_token = await self.endpoints.request('login', login_endpoints, login)
+        except ApiError as e:
+            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Web login failed ({e.kind}): {str(e)[:50]}...{Style.RESET_ALL}")
+            return None
+        return access_token
+
+    async def _get_access_token(self, address: str, signer: WalletSigner, proxy=None, action: str = "Daily checkin"):
+        """Токен из хранилища; подпись и логин - только если токена нет или он истек"""
+        access_token = self.web3_manager.tokens.get(TOKEN_SCOPE, signer)
+        if access_token:
+            return access_token
+        
+        timestamp = int(time.time() * 1000)
+        message = f"{action} for {address} at {timestamp}"
+        
+        encoded_message = encode_defunct(text=message)
+        signed_message = signer.sign_message(encoded_message)
+        signature = to_hex(signed_message.signature)
+        
+        access_token = await self._web_login(address, message, signature, proxy)
+        if access_token:
+            self.web3_manager.tokens.put(TOKEN_SCOPE, signer, access_token)
+        return access_token
+
+    async def get_checkin_status(self, address: str, signer: WalletSigner, proxy=None, force_check=False):
         """Получение статуса чекина с улучшенной проверкой"""
         try:
-            timestamp = int(time.time() * 1000)
-            message = f"Check status for {address} at {timestamp}"
-            
-            encoded_message = encode_defunct(text=message)
-            signed_message = Account.sign_message(encoded_message, private_key=private_key)
-            signature = to_hex(signed_message.signature)
-            
-            connector = ProxyConnector.from_url(proxy) if proxy else None
-            
-            login_endpoints = [
-                f'{self.config.BASE_API}/auth/login',
-                f'{self.config.BASE_API}/api/auth/login',
-                'https://testnet.pharosnetwork.xyz/api/auth/login'
-            ]
-            
-            for login_endpoint in login_endpoints:
+            # Вторая попытка - только если сохраненный токен отвергнут (401/403)
+            for _ in range(2):
+                access_token = await self._get_access_token(address, signer, proxy, "Check status")
+                if not access_token:
+                    Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Cannot determine checkin status, will attempt checkin{Style.RESET_ALL}")
+                    return True
+                
                 try:
-                    async with ClientSession(connector=connector, timeout=ClientTimeout(total=60)) as session:
-                        async with session.post(
-                            login_endpoint,
-                            json={
-                                'address': address,
-                                'message': message,
-                                'signature': signature
-                            },
-                            headers=get_headers()
-                        ) as response:
-                            if response.status == 200:
-                                result = await response.json()
-                                if result.get('success'):
-                                    access_token = result.get('data', {}).get('accessToken')
-                                    
-                                    if not access_token:
-                                        Logger.log(f"{Fore.YELLOW + Style.BRIGHT}No access token received from {login_endpoint}{Style.RESET_ALL}")
-                                        continue
-                                    
-                                    headers_with_auth = get_headers()
-                                    headers_with_auth['Authorization'] = f'Bearer {access_token}'
-                                    
-                                    status_endpoints = [
-                                        f'{self.config.BASE_API}/user/checkin-status',
-                                        f'{self.config.BASE_API}/api/user/checkin-status',
-                                        'https://testnet.pharosnetwork.xyz/api/user/checkin-status'
-                                    ]
-                                    
-                                    for status_endpoint in status_endpoints:
-                                        try:
-                                            async with session.get(status_endpoint, headers=headers_with_auth) as status_response:
-                                                if status_response.status == 200:
-                                                    status_result = await status_response.json()
-                                                    if status_result.get('success'):
-                                                        data = status_result.get('data', {})
-                                                        last_checkin = data.get('lastCheckin')
-                                                        
-                                                        if force_check:
-                                                            Logger.log(f"{Fore.CYAN + Style.BRIGHT}Force check enabled, will attempt checkin{Style.RESET_ALL}")
-                                                            return True
-                                                        
-                                                        if last_checkin:
-                                                            try:
-                                                                if 'T' in last_checkin:
-                                                                    last_time = datetime.fromisoformat(last_checkin.replace('Z', '+00:00'))
-                                                                else:
-                                                                    last_time = datetime.fromtimestamp(int(last_checkin), tz=pytz.UTC)
-                                                                
-                                                                current_time = datetime.now(pytz.UTC)
-                                                                time_diff = current_time - last_time
-                                                                
-                                                                if time_diff.total_seconds() < 23 * 3600:
-                                                                    remaining = 24 * 3600 - time_diff.total_seconds()
-                                                                    time_str = self.format_time_remaining(int(remaining))
-                                                                    Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Checkin cooldown: {time_str} remaining{Style.RESET_ALL}")
-                                                                    return False
-                                                                else:
-                                                                    Logger.log(f"{Fore.GREEN + Style.BRIGHT}Checkin available - last checkin was {time_diff.total_seconds()/3600:.1f} hours ago{Style.RESET_ALL}")
-                                                                    return True
-                                                            except Exception as time_error:
-                                                                Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Time parse error: {time_error}, assuming checkin available{Style.RESET_ALL}")
-                                                                return True
-                                                        else:
-                                                            Logger.log(f"{Fore.GREEN + Style.BRIGHT}No previous checkin found, checkin available{Style.RESET_ALL}")
-                                                            return True
-                                                else:
-                                                    Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Status endpoint {status_endpoint} returned {status_response.status}{Style.RESET_ALL}")
-                                        except Exception as status_error:
-                                            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Status endpoint {status_endpoint} failed: {str(status_error)[:50]}...{Style.RESET_ALL}")
-                                            continue
-                                    
-                                    Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Cannot check status, assuming checkin available{Style.RESET_ALL}")
-                                    return True
-                                else:
-                                    Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Login failed at {login_endpoint}: {result}{Style.RESET_ALL}")
-                            else:
-                                Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Login endpoint {login_endpoint} returned {response.status}{Style.RESET_ALL}")
-                except Exception as login_error:
-                    Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Login endpoint {login_endpoint} failed: {str(login_error)[:50]}...{Style.RESET_ALL}")
-                    continue
+                    return await self._checkin_status_with_token(access_token, proxy, force_check)
+                except ApiError:
+                    Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Access token rejected, logging in again...{Style.RESET_ALL}")
+                    self.web3_manager.tokens.invalidate(TOKEN_SCOPE, address)
             
-            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Cannot determine checkin status, will attempt checkin{Style.RESET_ALL}")
+            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Cannot check status, assuming checkin available{Style.RESET_ALL}")
             return True
                         
         except Exception as e:
             Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Checkin status check failed: {e}, will try checkin{Style.RESET_ALL}")
             return True
 
-    async def daily_checkin(self, address: str, private_key: str, proxy=None, max_retries=3, force_checkin=False):
+    async def _checkin_status_with_token(self, access_token: str, proxy=None, force_check=False):
+        """Статус чекина с готовым токеном (ApiError вида auth пробрасывается)"""
+        headers_with_auth = get_headers()
+        headers_with_auth['Authorization'] = f'Bearer {access_token}'
+        
+        status_endpoints = [
+            f'{self.config.BASE_API}/user/checkin-status',
+            f'{self.config.BASE_API}/api/user/checkin-status',
+            'https://testnet.pharosnetwork.xyz/api/user/checkin-status'
+        ]
+        
+        async def status(status_endpoint):
+            status_result = await self.web3_manager.api.get(proxy, status_endpoint, headers=headers_with_auth, timeout=60)
+            if not status_result.get('success'):
+                raise ApiError(BUSINESS, f"Status response: {status_result}", payload=status_result)
+            return status_result
+        
+        try:
+            _, status_result = await self.endpoints.request('checkin_status', status_endpoints, status)
+        except ApiError as e:
+            if e.kind == AUTH:
+                raise
+            status_result = None
+        
+        if status_result is not None:
+            data = status_result.get('data', {})
+            last_checkin = data.get('lastCheckin')
+            
+            if force_check:
+                Logger.log(f"{Fore.CYAN + Style.BRIGHT}Force check enabled, will attempt checkin{Style.RESET_ALL}")
+                return True
+            
+            if not last_checkin:
+                Logger.log(f"{Fore.GREEN + Style.BRIGHT}No previous checkin found, checkin available{Style.RESET_ALL}")
+                return True
+            
+            try:
+                if 'T' in last_checkin:
+                    last_time = datetime.fromisoformat(last_checkin.replace('Z', '+00:00'))
+                else:
+                    last_time = datetime.fromtimestamp(int(last_checkin), tz=pytz.UTC)
+                
+                current_time = datetime.now(pytz.UTC)
+                time_diff = current_time - last_time
+                
+                if time_diff.total_seconds() < 23 * 3600:
+                    remaining = 24 * 3600 - time_diff.total_seconds()
+                    time_str = self.format_time_remaining(int(remaining))
+                    Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Checkin cooldown: {time_str} remaining{Style.RESET_ALL}")
+                    return False
+                else:
+                    Logger.log(f"{Fore.GREEN + Style.BRIGHT}Checkin available - last checkin was {time_diff.total_seconds()/3600:.1f} hours ago{Style.RESET_ALL}")
+                    return True
+            except Exception as time_error:
+                Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Time parse error: {time_error}, assuming checkin available{Style.RESET_ALL}")
+                return True
+        
+        Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Cannot check status, assuming checkin available{Style.RESET_ALL}")
+        return True
+
+    async def daily_checkin(self, address: str, signer: WalletSigner, proxy=None, max_retries=3, force_checkin=False):
         """Улучшенный ежедневный чекин с retry логикой"""
         
         for attempt in range(max_retries):
             try:
                 if attempt == 0 and not force_checkin:
-                    can_checkin = await self.get_checkin_status(address, private_key, proxy)
+                    can_checkin = await self.get_checkin_status(address, signer, proxy)
                     if not can_checkin:
                         return "cooldown"
                 
-                timestamp = int(time.time() * 1000)
-                message = f"Daily checkin for {address} at {timestamp}"
-                
-                encoded_message = encode_defunct(text=message)
-                signed_message = Account.sign_message(encoded_message, private_key=private_key)
-                signature = to_hex(signed_message.signature)
-                
-                connector = ProxyConnector.from_url(proxy) if proxy else None
-                
-                login_endpoints = [
-                    f'{self.config.BASE_API}/auth/login',
-                    f'{self.config.BASE_API}/api/auth/login',
-                    'https://testnet.pharosnetwork.xyz/api/auth/login'
-                ]
-                
-                for login_endpoint in login_endpoints:
+                access_token = await self._get_access_token(address, signer, proxy)
+                if access_token:
+                    headers_with_auth = get_headers()
+                    headers_with_auth['Authorization'] = f'Bearer {access_token}'
+                    
+                    checkin_endpoints = [
+                        f'{self.config.BASE_API}/user/checkin',
+                        f'{self.config.BASE_API}/api/user/checkin',
+                        'https://testnet.pharosnetwork.xyz/api/user/checkin'
+                    ]
+                    
+                    async def checkin(checkin_endpoint):
+                        checkin_result = await self.web3_manager.api.post(proxy, checkin_endpoint, headers=headers_with_auth)
+                        if checkin_result.get('success'):
+                            return True
+                        if 'already' in str(checkin_result).lower() or 'cooldown' in str(checkin_result).lower():
+                            return "already_checked"
+                        raise ApiError(BUSINESS, f"Checkin response: {checkin_result}", payload=checkin_result)
+                    
                     try:
-                        async with ClientSession(connector=connector, timeout=ClientTimeout(total=30)) as session:
-                            async with session.post(
-                                login_endpoint,
-                                json={
-                                    'address': address,
-                                    'message': message,
-                                    'signature': signature
-                                },
-                                headers=get_headers()
-                            ) as response:
-                                if response.status == 200:
-                                    result = await response.json()
-                                    if result.get('success'):
-                                        access_token = result.get('data', {}).get('accessToken')
-                                        
-                                        if not access_token:
-                                            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}No access token from {login_endpoint}{Style.RESET_ALL}")
-                                            continue
-                                        
-                                        headers_with_auth = get_headers()
-                                        headers_with_auth['Authorization'] = f'Bearer {access_token}'
-                                        
-                                        checkin_endpoints = [
-                                            f'{self.config.BASE_API}/user/checkin',
-                                            f'{self.config.BASE_API}/api/user/checkin',
-                                            'https://testnet.pharosnetwork.xyz/api/user/checkin'
-                                        ]
-                                        
-                                        for checkin_endpoint in checkin_endpoints:
-                                            try:
-                                                async with session.post(checkin_endpoint, headers=headers_with_auth) as checkin_response:
-                                                    if checkin_response.status == 200:
-                                                        checkin_result = await checkin_response.json()
-                                                        if checkin_result.get('success'):
-                                                            Logger.log(f"{Fore.GREEN + Style.BRIGHT}Daily checkin successful! ✅{Style.RESET_ALL}")
-                                                            return True
-                                                        elif 'already' in str(checkin_result).lower() or 'cooldown' in str(checkin_result).lower():
-                                                            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Already checked in today{Style.RESET_ALL}")
-                                                            return "already_checked"
-                                                        else:
-                                                            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Checkin response from {checkin_endpoint}: {checkin_result}{Style.RESET_ALL}")
-                                                    else:
-                                                        Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Checkin endpoint {checkin_endpoint} returned {checkin_response.status}{Style.RESET_ALL}")
-                                                        continue
-                                            except Exception as e:
-                                                Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Checkin endpoint {checkin_endpoint} failed: {str(e)[:50]}...{Style.RESET_ALL}")
-                                                continue
-                                        
-                                        Logger.log(f"{Fore.YELLOW + Style.BRIGHT}All checkin endpoints failed for login {login_endpoint}{Style.RESET_ALL}")
-                                    else:
-                                        Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Login failed at {login_endpoint}: {result}{Style.RESET_ALL}")
-                                else:
-                                    Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Login endpoint {login_endpoint} returned {response.status}{Style.RESET_ALL}")
-                    except Exception as e:
-                        Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Login endpoint {login_endpoint} error: {str(e)[:50]}...{Style.RESET_ALL}")
-                        continue
+                        _, checkin_result = await self.endpoints.request('checkin', checkin_endpoints, checkin, hedge=False)
+                    except ApiError as e:
+                        if e.kind == AUTH:
+                            # Токен отвергнут - следующая попытка залогинится заново
+                            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Access token rejected, logging in again...{Style.RESET_ALL}")
+                            self.web3_manager.tokens.invalidate(TOKEN_SCOPE, address)
+                        else:
+                            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}All checkin endpoints failed{Style.RESET_ALL}")
+                        checkin_result = None
+                    
+                    if checkin_result is True:
+                        Logger.log(f"{Fore.GREEN + Style.BRIGHT}Daily checkin successful! ✅{Style.RESET_ALL}")
+                        return True
+                    if checkin_result == "already_checked":
+                        Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Already checked in today{Style.RESET_ALL}")
+                        return "already_checked"
                 
                 if attempt < max_retries - 1:
-                    Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Checkin attempt {attempt + 1} failed, retrying in 10 seconds...{Style.RESET_ALL}")
-                    await asyncio.sleep(10)
+                    Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Checkin attempt {attempt + 1} failed, retrying...{Style.RESET_ALL}")
+                    await self.web3_manager.api.backoff(attempt)
                 else:
                     Logger.log(f"{Fore.RED + Style.BRIGHT}Daily checkin failed after {max_retries} attempts{Style.RESET_ALL}")
                     return None
@@ -426,9 +405,9 @@ class FaucetManager:
             except Exception as e:
                 if attempt < max_retries - 1:
                     Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Checkin attempt {attempt + 1} failed: {str(e)[:50]}..., retrying...{Style.RESET_ALL}")
-                    await asyncio.sleep(10)
+                    await self.web3_manager.api.backoff(attempt)
                 else:
                     Logger.log(f"{Fore.RED + Style.BRIGHT}Daily checkin error after {max_retries} attempts: {e}{Style.RESET_ALL}")
                     return None
         
-        return None
\ No newline at end of file
+        return None
\ No newline at end of file
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+import time
+import asyncio
+from statistics import median
+from config import Config
+from utils import Logger
+from colorama import Fore, Style
+
+class FeeOracle:
+    """Рекомендации EIP-1559 комиссий по eth_feeHistory, один запрос на блок"""
+
+    def __init__(self):
+        self.config = Config()
+        self.tiers = self.config.FEE_TIERS
+        self.percentiles = [tier['percentile'] for tier in self.tiers.values()]
+        
+        self._history = None  # (base_fee, {tier: priority_fee}, block_number)
+        self._fetched_at = 0
+        self._latest_block = None  # последний известный блок (обновляется снаружи)
+        self._latest_block_at = 0  # когда этот блок был увиден
+        self._lock = asyncio.Lock()
+
+    def on_new_block(self, block_number: int):
+        """Новый блок - кэш комиссий устарел"""
+        if self._latest_block is None or block_number >= self._latest_block:
+            self._latest_block = block_number
+            self._latest_block_at = time.time()
+
+    def _is_fresh(self):
+        """Актуален ли кэш: тот же блок или не истек TTL"""
+        if self._history is None:
+            return False
+        # Номеру блока верим, только пока его обновляют (опрос квитанций или подписка);
+        # иначе новые блоки не видны и кэш живет не дольше FEE_CACHE_TTL
+        if self._latest_block is not None and time.time() - self._latest_block_at < self.config.FEE_CACHE_TTL:
+            return self._history[2] >= self._latest_block
+        return time.time() - self._fetched_at < self.config.FEE_CACHE_TTL
+
+    async def _refresh(self, web3):
+        """Загрузка истории комиссий за последние блоки"""
+        history = await web3.eth.fee_history(self.config.FEE_HISTORY_BLOCKS, 'latest', self.percentiles)
+        
+        # Последний элемент baseFeePerGas - базовая комиссия следующего блока
+        base_fee = history['baseFeePerGas'][-1]
+        rewards = history.get('reward') or []
+        priority_fees = {}
+        for index, name in enumerate(self.tiers):
+            samples = [block_rewards[index] for block_rewards in rewards if len(block_rewards) > index]
+            priority_fees[name] = int(median(samples)) if samples else 0
+        
+        block_number = history['oldestBlock'] + len(history['baseFeePerGas']) - 2
+        self._history = (base_fee, priority_fees, block_number)
+        self._fetched_at = time.time()
+        self.on_new_block(block_number)
+
+    async def get_fees(self, web3, tier: str = 'normal', bump: float = 1.0):
+        """Параметры maxFeePerGas/maxPriorityFeePerGas для уровня срочности; bump - множитель для замены транзакций"""
+        if not self._is_fresh():
+            async with self._lock:
+                if not self._is_fresh():
+                    try:
+                        await self._refresh(web3)
+                    except Exception as e:
+                        Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Fee history unavailable, using fallback fees: {str(e)[:50]}{Style.RESET_ALL}")
+                        if self._history is None:
+                            return self._fallback_fees(web3, bump)
+        
+        base_fee, priority_fees, _ = self._history
+        settings = self.tiers[tier]
+        
+        priority_fee = max(priority_fees[tier], web3.to_wei(self.config.FEE_MIN_PRIORITY_GWEI, 'gwei'))
+        max_fee = int(base_fee * settings['base_fee_multiplier']) + priority_fee
+        return {
+            'maxFeePerGas': int(max_fee * bump),
+            'maxPriorityFeePerGas': int(priority_fee * bump)
+        }
+
+    def _fallback_fees(self, web3, bump: float):
+        """Фиксированные комиссии, если RPC не поддерживает eth_feeHistory"""
+        return {
+            'maxFeePerGas': int(web3.to_wei(self.config.FEE_FALLBACK_MAX_GWEI, 'gwei') * bump),
+            'maxPriorityFeePerGas': int(web3.to_wei(self.config.FEE_FALLBACK_PRIORITY_GWEI, 'gwei') * bump)
+        }
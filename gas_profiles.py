@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+from config import Config
+from utils import Logger, FileManager
+from colorama import Fore, Style
+
+class GasProfiles:
+    """Профили расхода газа по (контракт, селектор) с сохранением на диск"""
+
+    def __init__(self):
+        self.config = Config()
+        self.cache_file = self.config.GAS_PROFILES_FILE
+        # "контракт:селектор" -> {"gas": максимум наблюдаемого расхода, "samples": число замеров}
+        self.profiles = FileManager.load_json(self.cache_file, {})
+
+    @staticmethod
+    def profile_key(tx: dict):
+        """Ключ профиля: адрес получателя и селектор вызываемой функции"""
+        data = tx.get('data') or '0x'
+        if isinstance(data, (bytes, bytearray)):
+            data = '0x' + bytes(data).hex()
+        selector = data[:10].lower() if len(data) >= 10 else '0x'
+        return f"{str(tx.get('to', '')).lower()}:{selector}"
+
+    def get_limit(self, key: str):
+        """Лимит газа с запасом или None, если профиль еще не известен"""
+        profile = self.profiles.get(key)
+        if not profile:
+            return None
+        return int(profile["gas"] * self.config.GAS_LIMIT_MARGIN)
+
+    def record(self, key: str, gas: int):
+        """Учет замера (оценки или фактического gasUsed)"""
+        profile = self.profiles.get(key)
+        if profile is None:
+            self.profiles[key] = {"gas": int(gas), "samples": 1}
+            Logger.log(f"{Fore.CYAN + Style.BRIGHT}Cached gas profile {key[:10]}...{key[-10:]}: {gas}{Style.RESET_ALL}")
+            self.save()
+            return
+        
+        profile["samples"] += 1
+        if gas > profile["gas"]:
+            # На диск пишем только при росте максимума, чтобы не сохранять после каждой транзакции
+            profile["gas"] = int(gas)
+            self.save()
+
+    def record_revert(self, key: str, gas_used: int, gas_limit: int):
+        """Откат транзакции: если газ израсходован почти весь, профиль поднимается"""
+        if not gas_limit or gas_used < gas_limit * self.config.GAS_OUT_OF_GAS_RATIO:
+            return
+        Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Transaction ran out of gas ({gas_used}/{gas_limit}), raising gas profile {key[:10]}...{key[-10:]}{Style.RESET_ALL}")
+        self.record(key, int(gas_limit * self.config.GAS_OUT_OF_GAS_BUMP))
+
+    async def resolve_limit(self, web3, tx: dict, sender: str):
+        """Лимит газа: значение из транзакции (явное или из маршрута), поднятое до профиля; без него - профиль или eth_estimateGas"""
+        key = self.profile_key(tx)
+        limit = self.get_limit(key)
+        if tx.get('gas'):
+            # Лимит вызывающего не уменьшаем: ключ (контракт, селектор) общий для вызовов с разными аргументами
+            return max(limit or 0, tx['gas'])
+        if limit is not None:
+            return limit
+        
+        estimate_tx = {field: tx[field] for field in ('to', 'data', 'value') if field in tx}
+        estimate_tx['from'] = sender
+        try:
+            estimate = await web3.eth.estimate_gas(estimate_tx)
+        except Exception as e:
+            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Gas estimation failed, using default limit: {str(e)[:50]}{Style.RESET_ALL}")
+            return None
+        
+        self.record(key, estimate)
+        return self.get_limit(key)
+
+    def save(self):
+        """Сохранение профилей на диск"""
+        FileManager.save_json(self.cache_file, self.profiles)
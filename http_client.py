@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+from urllib.parse import urlsplit
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from aiohttp_proxy import ProxyConnector
+from config import Config
+
+class HttpClient:
+    """Общие HTTP сессии: одна долгоживущая keep-alive сессия на пару (прокси, хост)"""
+
+    def __init__(self, rate_limiter=None):
+        self.config = Config()
+        self.rate_limiter = rate_limiter
+        # (proxy, scheme://host:port) -> ClientSession
+        self.sessions = {}
+
+    @staticmethod
+    def origin_of(url: str):
+        """Схема и хост URL - ключ сессии"""
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}".lower()
+
+    def get_session(self, url: str, proxy=None, limit: int = None):
+        """Сессия для хоста URL через прокси (создается при первом обращении)"""
+        key = (proxy, self.origin_of(url))
+        session = self.sessions.get(key)
+        if session is None or session.closed:
+            connector_kwargs = {
+                'limit': limit or self.config.HTTP_CONNECTION_LIMIT,
+                'ttl_dns_cache': self.config.HTTP_DNS_CACHE_TTL,
+                'keepalive_timeout': self.config.HTTP_KEEPALIVE_TIMEOUT
+            }
+            connector = ProxyConnector.from_url(proxy, **connector_kwargs) if proxy else TCPConnector(**connector_kwargs)
+            session = ClientSession(
+                connector=connector,
+                timeout=ClientTimeout(total=self.config.HTTP_TIMEOUT),
+                trace_configs=[self.rate_limiter.trace_config] if self.rate_limiter is not None else None
+            )
+            self.sessions[key] = session
+        return session
+
+    def request(self, method: str, proxy, url: str, timeout: float = None, **kwargs):
+        """Запрос через общую сессию; используется как async with ... as response"""
+        if timeout is not None:
+            kwargs['timeout'] = ClientTimeout(total=timeout)
+        return self.get_session(url, proxy).request(method, url, **kwargs)
+
+    def get(self, proxy, url: str, **kwargs):
+        """GET запрос через общую сессию"""
+        return self.request('GET', proxy, url, **kwargs)
+
+    def post(self, proxy, url: str, **kwargs):
+        """POST запрос через общую сессию"""
+        return self.request('POST', proxy, url, **kwargs)
+
+    async def close(self):
+        """Закрытие всех сессий (при завершении работы)"""
+        sessions, self.sessions = list(self.sessions.values()), {}
+        for session in sessions:
+            if not session.closed:
+                await session.close()
@@ -2,8 +2,8 @@
 
 import time
 from web3 import Web3
-from eth_account import Account
 from config import Config
+from signer import WalletSigner
 from utils import Logger
 from colorama import Fore, Style
 
@@ -12,14 +12,15 @@ class LiquidityManager:
         self.config = Config()
         self.web3_manager = web3_manager
 
-    async def add_liquidity(self, web3, private_key: str, token0: str, token1: str, amount0: int, amount1: int):
+    async def add_liquidity(self, web3, signer: WalletSigner, token0: str, token1: str, amount0: int, amount1: int):
         """Добавление ликвидности через DVM пул как в JS версии"""
         try:
-            account = Account.from_key(private_key)
+            account = signer.account
             
             # Проверяем балансы токенов
-            usdc_balance = await self.web3_manager.get_token_balance(web3, account.address, token0)
-            usdt_balance = await self.web3_manager.get_token_balance(web3, account.address, token1)
+            balances = await self.web3_manager.get_token_balances(web3, account.address, [token0, token1])
+            usdc_balance = balances[token0]
+            usdt_balance = balances[token1]
             
             required_usdc = amount0 / 1000000  # 6 decimals
             required_usdt = amount1 / 1000000  # 6 decimals
@@ -29,14 +30,11 @@ class LiquidityManager:
                 return None
             
             # Одобряем токены
-            await self.web3_manager.approve_token(web3, private_key, token0, self.config.LIQUIDITY_CONTRACT, amount0)
-            await self.web3_manager.approve_token(web3, private_key, token1, self.config.LIQUIDITY_CONTRACT, amount1)
+            await self.web3_manager.approve_token(web3, signer, token0, self.config.LIQUIDITY_CONTRACT, amount0)
+            await self.web3_manager.approve_token(web3, signer, token1, self.config.LIQUIDITY_CONTRACT, amount1)
             
             # Используем правильный ABI для addDVMLiquidity
-            contract = web3.eth.contract(
-                address=self.config.LIQUIDITY_CONTRACT,
-                abi=self.config.LIQUIDITY_CONTRACT_ABI
-            )
+            contract = self.web3_manager.get_contract(web3, self.config.LIQUIDITY_CONTRACT, self.config.LIQUIDITY_CONTRACT_ABI)
             
             # Параметры как в JS версии
             dvm_address = self.config.DVM_POOL_ADDRESS
@@ -47,7 +45,7 @@ class LiquidityManager:
             flag = 0
             deadline = int(time.time()) + 600
             
-            tx = contract.functions.addDVMLiquidity(
+            tx = await contract.functions.addDVMLiquidity(
                 dvm_address,
                 base_in_amount,
                 quote_in_amount,
@@ -58,18 +56,14 @@ class LiquidityManager:
             ).build_transaction({
                 'from': account.address,
                 'gas': 600000,
-                'maxFeePerGas': web3.to_wei(2, 'gwei'),
-                'maxPriorityFeePerGas': web3.to_wei(1, 'gwei'),
-                'nonce': web3.eth.get_transaction_count(account.address, 'pending'),
+                **await self.web3_manager.get_fees(web3),
                 'chainId': self.config.CHAIN_ID
             })
             
-            signed_tx = web3.eth.account.sign_transaction(tx, private_key)
-            raw_tx = signed_tx.raw_transaction if hasattr(signed_tx, 'raw_transaction') else signed_tx.rawTransaction
-            tx_hash = web3.eth.send_raw_transaction(raw_tx)
+            tx_hash = await self.web3_manager.send_transaction(web3, signer, tx)
             
             Logger.log(f"{Fore.GREEN + Style.BRIGHT}Add Liquidity transaction sent! TX: {tx_hash.hex()}{Style.RESET_ALL}")
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=300)
+            receipt = await self.web3_manager.wait_for_receipt(web3, tx_hash, timeout=300)
             
             if receipt.status == 1:
                 Logger.log(f"{Fore.GREEN + Style.BRIGHT}Liquidity added successfully!{Style.RESET_ALL}")
@@ -5,7 +5,6 @@ import random
 import warnings
 from decimal import Decimal
 from web3 import Web3
-from eth_account import Account
 from colorama import Fore, Style
 
 # Отключаем предупреждения
@@ -13,6 +12,7 @@ warnings.filterwarnings("ignore", category=UserWarning)
 
 # Импорты модулей
 from config import Config
+from signer import WalletSigner
 from utils import Logger, FileManager
 from account_proxy_manager import AccountProxyManager
 from web3_manager import Web3Manager
@@ -224,8 +224,9 @@ class PharosBotAdvanced:
         """Обработка одного кошелька - РАСШИРЕННАЯ ВЕРСИЯ"""
         results = {}
         
-        account = Account.from_key(private_key)
-        address = account.address
+        # Ключ и адрес выводятся один раз; дальше всем менеджерам передается подписант
+        signer = WalletSigner.from_key(private_key)
+        address = signer.address
         
         # Получаем прокси для конкретного аккаунта
         proxy = None
@@ -236,10 +237,6 @@ class PharosBotAdvanced:
             else:
                 Logger.log(f"{Fore.YELLOW + Style.BRIGHT}No proxy configured for {address[:8]}...{Style.RESET_ALL}")
         
-        # Случайная задержка для многопоточности
-        if config.get('parallel_wallets', 1) > 1:
-            await asyncio.sleep(random.uniform(0.5, 3))
-        
         try:
             web3 = await self.web3_manager.get_web3_connection(proxy)
             balance = await self.web3_manager.get_token_balance(web3, address, "PHRS")
@@ -248,7 +245,7 @@ class PharosBotAdvanced:
             # 1. Faucet операции
             if config.get('faucet_enabled', False) and balance < 0.1:
                 Logger.log(f"{Fore.BLUE + Style.BRIGHT}Starting faucet operations...{Style.RESET_ALL}")
-                faucet_result = await self.faucet_manager.claim_faucet(web3, private_key, proxy)
+                faucet_result = await self.faucet_manager.claim_faucet(web3, signer, proxy)
                 results['faucet'] = faucet_result
             else:
                 Logger.log(f"{Fore.CYAN + Style.BRIGHT}Faucet disabled or sufficient balance{Style.RESET_ALL}")
@@ -258,7 +255,7 @@ class PharosBotAdvanced:
             if config.get('checkin_enabled', False):
                 Logger.log(f"{Fore.BLUE + Style.BRIGHT}Starting daily checkin...{Style.RESET_ALL}")
                 
-                web_checkin_result = await self.web_checkin_manager.perform_web_checkin(private_key, proxy)
+                web_checkin_result = await self.web_checkin_manager.perform_web_checkin(signer, proxy)
                 
                 if web_checkin_result:
                     checkin_result = web_checkin_result.get('checkin')
@@ -271,9 +268,6 @@ class PharosBotAdvanced:
                         Logger.log(f"{Fore.GREEN + Style.BRIGHT}✅ Daily checkin completed successfully!{Style.RESET_ALL}")
                     elif checkin_result == "already_checked":
                         Logger.log(f"{Fore.YELLOW + Style.BRIGHT}⏳ Already checked in today{Style.RESET_ALL}")
-                    
-                    delay = 2 if config.get('parallel_wallets', 1) > 1 else 3
-                    await asyncio.sleep(delay)
                 else:
                     Logger.log(f"{Fore.RED + Style.BRIGHT}❌ Web checkin failed{Style.RESET_ALL}")
                     results['checkin'] = "failed"
@@ -285,24 +279,25 @@ class PharosBotAdvanced:
                 Logger.log(f"{Fore.BLUE + Style.BRIGHT}Starting AquaFlux operations...{Style.RESET_ALL}")
                 
                 try:
-                    access_token = await self.aquaflux_manager.aquaflux_login(address, private_key, proxy)
+                    access_token = await self.aquaflux_manager.aquaflux_login(address, signer, proxy)
                     if access_token:
-                        claim_result = await self.aquaflux_manager.claim_aquaflux_tokens(web3, private_key)
-                        results['claim'] = claim_result
-                        
-                        if claim_result and claim_result != "already_claimed":
-                            await asyncio.sleep(5)
-                            
-                            craft_result = await self.aquaflux_manager.craft_cs_tokens(web3, private_key)
-                            results['craft'] = craft_result
+                        # Подпись для минта запрашивается сразу, параллельно с подтверждением claim и craft
+                        signature_task = self.aquaflux_manager.prefetch_mint_signature(address, signer, 0, proxy)
+                        try:
+                            claim_result = await self.aquaflux_manager.claim_aquaflux_tokens(web3, signer)
+                            results['claim'] = claim_result
                             
-                            if craft_result:
-                                await asyncio.sleep(5)
+                            if claim_result and claim_result != "already_claimed":
+                                craft_result = await self.aquaflux_manager.craft_cs_tokens(web3, signer)
+                                results['craft'] = craft_result
                                 
-                                signature_data = await self.aquaflux_manager.get_aquaflux_signature(address, access_token, 0, proxy)
-                                if signature_data:
-                                    mint_result = await self.aquaflux_manager.mint_aquaflux_nft(web3, private_key, signature_data)
-                                    results['mint'] = mint_result
+                                if craft_result:
+                                    signature_data = await self.aquaflux_manager.take_mint_signature(signature_task, address, signer, 0, proxy)
+                                    if signature_data:
+                                        mint_result = await self.aquaflux_manager.mint_aquaflux_nft(web3, signer, signature_data)
+                                        results['mint'] = mint_result
+                        finally:
+                            signature_task.cancel()
                     else:
                         Logger.log(f"{Fore.YELLOW + Style.BRIGHT}AquaFlux login failed - server may be down{Style.RESET_ALL}")
                         results['aquaflux'] = "server_error"
@@ -337,19 +332,14 @@ class PharosBotAdvanced:
                         continue
                     
                     if from_token.lower() != "0xeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeee":
-                        await self.web3_manager.approve_token(web3, private_key, from_token, self.config.DODO_ROUTER, amount)
+                        await self.web3_manager.approve_token(web3, signer, from_token, self.config.DODO_ROUTER, amount)
                     
                     route_data = await self.swap_manager.fetch_dodo_route(from_token, to_token, address, amount, proxy)
                     if route_data:
-                        swap_result = await self.swap_manager.execute_swap(web3, private_key, route_data)
+                        swap_result = await self.swap_manager.execute_swap(web3, signer, route_data)
                         if swap_result:
                             successful_swaps += 1
                             results[f'swap_{i+1}'] = swap_result
-                    
-                    if i < total_swaps - 1:
-                        delay = random.randint(1, 10)
-                        Logger.log(f"{Fore.CYAN + Style.BRIGHT}Waiting {delay} seconds...{Style.RESET_ALL}")
-                        await asyncio.sleep(delay)
                 
                 Logger.log(f"{Fore.GREEN + Style.BRIGHT}Completed {successful_swaps}/{total_swaps} swaps{Style.RESET_ALL}")
             
@@ -363,22 +353,19 @@ class PharosBotAdvanced:
                 for lp_round in range(liquidity_count):
                     Logger.log(f"{Fore.MAGENTA + Style.BRIGHT}Liquidity operation {lp_round + 1}/{liquidity_count}{Style.RESET_ALL}")
                     
-                    usdc_balance = await self.web3_manager.get_token_balance(web3, address, self.config.USDC_CONTRACT)
-                    usdt_balance = await self.web3_manager.get_token_balance(web3, address, self.config.USDT_CONTRACT)
+                    balances = await self.web3_manager.get_token_balances(web3, address, [self.config.USDC_CONTRACT, self.config.USDT_CONTRACT])
+                    usdc_balance = balances[self.config.USDC_CONTRACT]
+                    usdt_balance = balances[self.config.USDT_CONTRACT]
                     
                     required_usdc = self.config.USDC_LIQUIDITY_AMOUNT / 1000000
                     required_usdt = self.config.USDT_LIQUIDITY_AMOUNT / 1000000
                     
                     if usdc_balance >= required_usdc and usdt_balance >= required_usdt:
-                        lp_result = await self.liquidity_manager.add_liquidity(web3, private_key, self.config.USDC_CONTRACT, self.config.USDT_CONTRACT, 
+                        lp_result = await self.liquidity_manager.add_liquidity(web3, signer, self.config.USDC_CONTRACT, self.config.USDT_CONTRACT, 
                                                        self.config.USDC_LIQUIDITY_AMOUNT, self.config.USDT_LIQUIDITY_AMOUNT)
                         if lp_result:
                             successful_lp += 1
                             results[f'liquidity_{lp_round+1}'] = lp_result
-                        
-                        if lp_round < liquidity_count - 1:
-                            delay = random.randint(1, 10)
-                            await asyncio.sleep(delay)
                     else:
                         Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Insufficient tokens for liquidity{Style.RESET_ALL}")
                         break
@@ -392,16 +379,16 @@ class PharosBotAdvanced:
                 trade_count = config.get('brokex_trade_count', 3)
                 trade_amount = config.get('brokex_trade_amount', 1.0)
                 
-                # Проверяем баланс USDT для торговли
-                usdt_balance = await self.brokex_manager.get_usdt_balance(web3, address)
+                # Проверяем баланс USDT для торговли (USDT и PHRS одним батчем)
+                trading_info = await self.brokex_manager.get_trading_info(web3, address)
+                usdt_balance = trading_info['usdt_balance'] if trading_info else 0
                 total_needed = trade_count * trade_amount
                 
                 if usdt_balance >= total_needed:
-                    trading_info = await self.brokex_manager.get_trading_info(web3, address)
                     Logger.log(f"{Fore.CYAN + Style.BRIGHT}Trading Info - USDT: {trading_info['usdt_balance']:.6f}, PHRS: {trading_info['phrs_balance']:.6f}{Style.RESET_ALL}")
                     
                     successful_trades = await self.brokex_manager.execute_random_trades(
-                        web3, private_key, trade_count, trade_amount, 5, 15
+                        web3, signer, trade_count, trade_amount, 5, 15
                     )
                     
                     results['brokex_trades'] = successful_trades
@@ -424,7 +411,7 @@ class PharosBotAdvanced:
                     
                     # Выполняем полный цикл DeFi операций
                     defi_success = await self.openfi_manager.full_defi_cycle(
-                        web3, private_key, deposit_amount, token_amount, token_amount/2, token_amount/3
+                        web3, signer, deposit_amount, token_amount, token_amount/2, token_amount/3
                     )
                     
                     results['openfi_defi'] = defi_success
@@ -465,16 +452,11 @@ class PharosBotAdvanced:
                         
                         Logger.log(f"{Fore.CYAN + Style.BRIGHT}Sending tip of {tip_amount_phrs:.8f} PHRS to @{config['tip_username']}{Style.RESET_ALL}")
                         
-                        tip_result = await self.tip_manager.send_tip(web3, private_key, config['tip_username'], tip_amount)
+                        tip_result = await self.tip_manager.send_tip(web3, signer, config['tip_username'], tip_amount)
                         if tip_result:
                             successful_tips += 1
                             results[f'tip_{tip_round+1}'] = tip_result
                             current_balance_float = current_balance_float - tip_amount_phrs
-                        
-                        if tip_round < tip_count - 1:
-                            delay = random.randint(10, 30)
-                            Logger.log(f"{Fore.CYAN + Style.BRIGHT}Waiting {delay} seconds before next tip...{Style.RESET_ALL}")
-                            await asyncio.sleep(delay)
                     
                     Logger.log(f"{Fore.GREEN + Style.BRIGHT}Completed {successful_tips}/{tip_count} tips{Style.RESET_ALL}")
             
@@ -497,7 +479,6 @@ class PharosBotAdvanced:
         for private_key in private_keys_batch:
             task = asyncio.create_task(self.process_wallet(private_key, config))
             tasks.append(task)
-            await asyncio.sleep(random.uniform(0.5, 2))
         
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
@@ -560,11 +541,6 @@ class PharosBotAdvanced:
                         else:
                             total_failed += 1
                             Logger.log(f"{Fore.RED + Style.BRIGHT}Wallet {i} failed{Style.RESET_ALL}")
-                        
-                        if i < len(private_keys):
-                            delay = random.randint(2, 8)
-                            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Waiting {delay} seconds before next wallet...{Style.RESET_ALL}")
-                            await asyncio.sleep(delay)
                 else:
                     Logger.log(f"{Fore.GREEN + Style.BRIGHT}Processing {len(private_keys)} wallets with {parallel_wallets} parallel workers{Style.RESET_ALL}")
                     
@@ -582,16 +558,12 @@ class PharosBotAdvanced:
                         total_failed += failed
                         
                         Logger.log(f"{Fore.GREEN + Style.BRIGHT}Batch {batch_num} completed: {successful} successful, {failed} failed{Style.RESET_ALL}")
-                        
-                        if batch_num < len(batches):
-                            delay = random.randint(5, 15)
-                            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Waiting {delay} seconds before next batch...{Style.RESET_ALL}")
-                            await asyncio.sleep(delay)
                 
                 Logger.log(f"{Fore.CYAN + Style.BRIGHT}All batches completed!{Style.RESET_ALL}")
                 Logger.log(f"{Fore.GREEN + Style.BRIGHT}Total successful wallets: {total_successful}{Style.RESET_ALL}")
                 Logger.log(f"{Fore.RED + Style.BRIGHT}Total failed wallets: {total_failed}{Style.RESET_ALL}")
                 Logger.log(f"{Fore.CYAN + Style.BRIGHT}Success rate: {(total_successful/(total_successful+total_failed)*100):.1f}%{Style.RESET_ALL}")
+                self.web3_manager.log_rpc_scores()
                 
                 wait_time = 24 * 60 * 60
                 Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Waiting 24 hours until next cycle...{Style.RESET_ALL}")
@@ -609,6 +581,9 @@ class PharosBotAdvanced:
         except Exception as e:
             Logger.log(f"{Fore.RED + Style.BRIGHT}Critical error: {e}{Style.RESET_ALL}")
             raise
+        finally:
+            await self.web3_manager.close()
+            WalletSigner.shutdown()
 
 def main():
     """Точка входа в программу"""
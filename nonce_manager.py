@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+import time
+import asyncio
+from config import Config
+from utils import Logger
+from colorama import Fore, Style
+
+class AddressNonces:
+    """Состояние nonce одного адреса"""
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.next_nonce = None  # следующий еще не выданный nonce
+        self.released = set()  # выданные, но не отправленные nonce (дыры)
+        self.pending = {}  # nonce -> tx_hash отправленных и еще не подтвержденных транзакций
+        self.tracked = set()  # nonce транзакций под сопровождением TxLifecycle (выпадение восстанавливает он)
+        self.synced_at = 0
+
+class NonceManager:
+    """Локальная выдача nonce: один запрос к RPC на адрес, дальше счетчик в памяти"""
+
+    def __init__(self):
+        self.config = Config()
+        self.addresses = {}
+
+    def _state(self, address: str):
+        """Состояние адреса (создается при первом обращении)"""
+        key = address.lower()
+        if key not in self.addresses:
+            self.addresses[key] = AddressNonces()
+        return self.addresses[key]
+
+    async def allocate(self, web3, address: str):
+        """Выдача nonce для новой транзакции; сначала заполняются дыры"""
+        state = self._state(address)
+        async with state.lock:
+            if state.next_nonce is None:
+                await self._sync(web3, address, state)
+            elif state.pending and time.time() - state.synced_at >= self.config.NONCE_RESYNC_INTERVAL:
+                await self._recover(web3, address, state)
+            
+            if state.released:
+                nonce = min(state.released)
+                state.released.discard(nonce)
+                return nonce
+            
+            nonce = state.next_nonce
+            # Nonce сопровождаемой транзакции занят, даже если сеть его пока не видит
+            while nonce in state.tracked:
+                nonce += 1
+            state.next_nonce = nonce + 1
+            return nonce
+
+    def release(self, address: str, nonce: int):
+        """Возврат nonce, транзакция с которым так и не была отправлена"""
+        state = self._state(address)
+        if state.next_nonce is None:
+            return
+        if nonce == state.next_nonce - 1:
+            state.next_nonce -= 1
+            # Освобожденный хвост схлопываем, чтобы не оставлять дыр на конце
+            while state.next_nonce - 1 in state.released:
+                state.next_nonce -= 1
+                state.released.discard(state.next_nonce)
+        else:
+            state.released.add(nonce)
+
+    def mark_sent(self, address: str, nonce: int, tx_hash):
+        """Учет отправленной транзакции"""
+        self._state(address).pending[nonce] = tx_hash
+
+    def track(self, address: str, nonce: int):
+        """Nonce сопровождает TxLifecycle: выпавшую транзакцию он отправит заново сам"""
+        self._state(address).tracked.add(nonce)
+
+    def untrack(self, address: str, nonce: int):
+        """Сопровождение завершено - восстановление nonce снова за менеджером"""
+        self._state(address).tracked.discard(nonce)
+
+    async def resync(self, web3, address: str):
+        """Принудительная синхронизация с сетью (например после "nonce too low")"""
+        state = self._state(address)
+        async with state.lock:
+            await self._sync(web3, address, state)
+
+    async def _sync(self, web3, address: str, state: AddressNonces):
+        """Счетчик берется из pending nonce сети, локальные дыры отбрасываются"""
+        chain_nonce = await web3.eth.get_transaction_count(address, 'pending')
+        if state.next_nonce is not None and chain_nonce != state.next_nonce:
+            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Nonce resync for {address[:10]}...: local {state.next_nonce}, network {chain_nonce}{Style.RESET_ALL}")
+        
+        state.next_nonce = chain_nonce
+        # Все nonce от chain_nonce снова выдаются по порядку - дыры сохранять нельзя, иначе nonce уйдет дважды
+        state.released = set()
+        # Отправленные nonce не ниже chain_nonce сеть не знает - запись о них устарела
+        state.pending = {n: h for n, h in state.pending.items() if n < chain_nonce}
+        state.synced_at = time.time()
+
+    async def _recover(self, web3, address: str, state: AddressNonces):
+        """Поиск выпавших из мемпула транзакций: их nonce снова становятся доступными"""
+        confirmed_nonce = await web3.eth.get_transaction_count(address, 'latest')
+        state.pending = {n: h for n, h in state.pending.items() if n >= confirmed_nonce}
+        state.released = {n for n in state.released if n >= confirmed_nonce}
+        state.synced_at = time.time()
+        
+        if not state.pending:
+            return
+        
+        nonces = sorted(state.pending)
+        transactions = await asyncio.gather(
+            *[web3.eth.get_transaction(state.pending[n]) for n in nonces],
+            return_exceptions=True
+        )
+        for nonce, transaction in zip(nonces, transactions):
+            if nonce in state.tracked:
+                # Выпавшую сопровождаемую транзакцию заменит TxLifecycle - nonce новым транзакциям не отдаем
+                continue
+            # Узел не знает транзакцию - она выпала, nonce нужно занять заново
+            if transaction is None or isinstance(transaction, Exception) and 'not found' in str(transaction).lower():
+                Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Transaction with nonce {nonce} was dropped, nonce will be reused{Style.RESET_ALL}")
+                del state.pending[nonce]
+                state.released.add(nonce)
+
+    @staticmethod
+    def is_nonce_error(error: Exception):
+        """Ошибка отправки из-за устаревшего nonce"""
+        message = str(error).lower()
+        return 'nonce too low' in message or 'nonce is too low' in message or 'invalid nonce' in message
@@ -4,8 +4,8 @@ import asyncio
 import random
 import time
 from web3 import Web3
-from eth_account import Account
 from config import Config
+from signer import WalletSigner
 from utils import Logger
 from colorama import Fore, Style
 
@@ -104,49 +104,29 @@ class OpenFiManager:
             "BTC": {"address": Web3.to_checksum_address("0xA4a967FC7cF0E9815bF5c2700A055813628b65BE"), "decimals": 18},
             "NVIDIA": {"address": Web3.to_checksum_address("0x3299cc551B2a39926Bf14144e65630e533dF6944"), "decimals": 18}
         }
+        
+        # Делимся decimals с общим реестром, чтобы балансы не запрашивали их у RPC
+        self.web3_manager.token_registry.register_many(self.tokens)
 
-    async def mint_token_faucet(self, web3, private_key: str, token_symbol: str, amount: float = 100):
+    async def mint_token_faucet(self, web3, signer: WalletSigner, token_symbol: str, amount: float = 100):
         """Минт токенов из фаусета"""
         try:
             if token_symbol not in self.tokens:
                 Logger.log(f"{Fore.RED + Style.BRIGHT}Unknown token: {token_symbol}{Style.RESET_ALL}")
                 return None
 
-            account = Account.from_key(private_key)
-            token_info = self.tokens[token_symbol]
-            
-            # Создаем контракт для минтинга
-            contract = web3.eth.contract(
-                address=self.MINT_ROUTER_ADDRESS,
-                abi=self.MINT_CONTRACT_ABI
-            )
-            
-            # Вычисляем amount с учетом decimals
-            amount_wei = int(amount * (10 ** token_info["decimals"]))
+            account = signer.account
             
             # Создаем транзакцию
-            tx = contract.functions.mint(
-                token_info["address"],
-                account.address,
-                amount_wei
-            ).build_transaction({
-                'from': account.address,
-                'gas': 300000,
-                'maxFeePerGas': web3.to_wei(2, 'gwei'),
-                'maxPriorityFeePerGas': web3.to_wei(1, 'gwei'),
-                'nonce': web3.eth.get_transaction_count(account.address, 'pending'),
-                'chainId': self.config.CHAIN_ID
-            })
+            tx = await self._build_mint_tx(web3, account.address, token_symbol, amount)
             
             # Подписываем и отправляем
-            signed_tx = web3.eth.account.sign_transaction(tx, private_key)
-            raw_tx = signed_tx.raw_transaction if hasattr(signed_tx, 'raw_transaction') else signed_tx.rawTransaction
-            tx_hash = web3.eth.send_raw_transaction(raw_tx)
+            tx_hash = await self.web3_manager.send_transaction(web3, signer, tx)
             
             Logger.log(f"{Fore.GREEN + Style.BRIGHT}Mint {amount} {token_symbol} transaction sent! TX: {tx_hash.hex()}{Style.RESET_ALL}")
             
             # Ждем подтверждения
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=300)
+            receipt = await self.web3_manager.wait_for_receipt(web3, tx_hash, timeout=300)
             
             if receipt.status == 1:
                 Logger.log(f"{Fore.GREEN + Style.BRIGHT}Successfully minted {amount} {token_symbol}!{Style.RESET_ALL}")
@@ -158,10 +138,10 @@ class OpenFiManager:
             Logger.log(f"{Fore.RED + Style.BRIGHT}Mint {token_symbol} error: {e}{Style.RESET_ALL}")
             return None
 
-    async def deposit_phrs(self, web3, private_key: str, amount: float):
+    async def deposit_phrs(self, web3, signer: WalletSigner, amount: float):
         """Депозит PHRS в пул ликвидности"""
         try:
-            account = Account.from_key(private_key)
+            account = signer.account
             
             # Проверяем баланс PHRS
             phrs_balance = await self.web3_manager.get_token_balance(web3, account.address, "PHRS")
@@ -170,15 +150,12 @@ class OpenFiManager:
                 return None
             
             # Создаем контракт для депозита
-            contract = web3.eth.contract(
-                address=self.DEPOSIT_ROUTER_ADDRESS,
-                abi=self.LENDING_CONTRACT_ABI
-            )
+            contract = self.web3_manager.get_contract(web3, self.DEPOSIT_ROUTER_ADDRESS, self.LENDING_CONTRACT_ABI)
             
             amount_wei = web3.to_wei(amount, 'ether')
             
             # Создаем транзакцию депозита
-            tx = contract.functions.depositETH(
+            tx = await contract.functions.depositETH(
                 "0x0000000000000000000000000000000000000000",  # lending pool placeholder
                 account.address,
                 0  # referral code
@@ -186,21 +163,17 @@ class OpenFiManager:
                 'from': account.address,
                 'value': amount_wei,
                 'gas': 400000,
-                'maxFeePerGas': web3.to_wei(2, 'gwei'),
-                'maxPriorityFeePerGas': web3.to_wei(1, 'gwei'),
-                'nonce': web3.eth.get_transaction_count(account.address, 'pending'),
+                **await self.web3_manager.get_fees(web3),
                 'chainId': self.config.CHAIN_ID
             })
             
             # Подписываем и отправляем
-            signed_tx = web3.eth.account.sign_transaction(tx, private_key)
-            raw_tx = signed_tx.raw_transaction if hasattr(signed_tx, 'raw_transaction') else signed_tx.rawTransaction
-            tx_hash = web3.eth.send_raw_transaction(raw_tx)
+            tx_hash = await self.web3_manager.send_transaction(web3, signer, tx)
             
             Logger.log(f"{Fore.GREEN + Style.BRIGHT}Deposit {amount} PHRS transaction sent! TX: {tx_hash.hex()}{Style.RESET_ALL}")
             
             # Ждем подтверждения
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=300)
+            receipt = await self.web3_manager.wait_for_receipt(web3, tx_hash, timeout=300)
             
             if receipt.status == 1:
                 Logger.log(f"{Fore.GREEN + Style.BRIGHT}Successfully deposited {amount} PHRS!{Style.RESET_ALL}")
@@ -212,14 +185,14 @@ class OpenFiManager:
             Logger.log(f"{Fore.RED + Style.BRIGHT}Deposit PHRS error: {e}{Style.RESET_ALL}")
             return None
 
-    async def supply_token(self, web3, private_key: str, token_symbol: str, amount: float):
+    async def supply_token(self, web3, signer: WalletSigner, token_symbol: str, amount: float):
         """Поставка токенов в lending пул"""
         try:
             if token_symbol not in self.tokens:
                 Logger.log(f"{Fore.RED + Style.BRIGHT}Unknown token: {token_symbol}{Style.RESET_ALL}")
                 return None
 
-            account = Account.from_key(private_key)
+            account = signer.account
             token_info = self.tokens[token_symbol]
             
             # Проверяем баланс токена
@@ -231,43 +204,23 @@ class OpenFiManager:
             # Одобряем токен
             amount_wei = int(amount * (10 ** token_info["decimals"]))
             approval_success = await self.web3_manager.approve_token(
-                web3, private_key, token_info["address"], self.SUPPLY_ROUTER_ADDRESS, amount_wei
+                web3, signer, token_info["address"], self.SUPPLY_ROUTER_ADDRESS, amount_wei
             )
             
             if not approval_success:
                 Logger.log(f"{Fore.RED + Style.BRIGHT}Failed to approve {token_symbol} for supply{Style.RESET_ALL}")
                 return None
             
-            # Создаем контракт для supply
-            contract = web3.eth.contract(
-                address=self.SUPPLY_ROUTER_ADDRESS,
-                abi=self.LENDING_CONTRACT_ABI
-            )
-            
             # Создаем транзакцию supply
-            tx = contract.functions.supply(
-                token_info["address"],
-                amount_wei,
-                account.address,
-                0  # referral code
-            ).build_transaction({
-                'from': account.address,
-                'gas': 400000,
-                'maxFeePerGas': web3.to_wei(2, 'gwei'),
-                'maxPriorityFeePerGas': web3.to_wei(1, 'gwei'),
-                'nonce': web3.eth.get_transaction_count(account.address, 'pending'),
-                'chainId': self.config.CHAIN_ID
-            })
+            tx = await self._build_supply_tx(web3, account.address, token_symbol, amount)
             
             # Подписываем и отправляем
-            signed_tx = web3.eth.account.sign_transaction(tx, private_key)
-            raw_tx = signed_tx.raw_transaction if hasattr(signed_tx, 'raw_transaction') else signed_tx.rawTransaction
-            tx_hash = web3.eth.send_raw_transaction(raw_tx)
+            tx_hash = await self.web3_manager.send_transaction(web3, signer, tx)
             
             Logger.log(f"{Fore.GREEN + Style.BRIGHT}Supply {amount} {token_symbol} transaction sent! TX: {tx_hash.hex()}{Style.RESET_ALL}")
             
             # Ждем подтверждения
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=300)
+            receipt = await self.web3_manager.wait_for_receipt(web3, tx_hash, timeout=300)
             
             if receipt.status == 1:
                 Logger.log(f"{Fore.GREEN + Style.BRIGHT}Successfully supplied {amount} {token_symbol}!{Style.RESET_ALL}")
@@ -279,49 +232,25 @@ class OpenFiManager:
             Logger.log(f"{Fore.RED + Style.BRIGHT}Supply {token_symbol} error: {e}{Style.RESET_ALL}")
             return None
 
-    async def borrow_token(self, web3, private_key: str, token_symbol: str, amount: float):
+    async def borrow_token(self, web3, signer: WalletSigner, token_symbol: str, amount: float):
         """Заем токенов из lending пула"""
         try:
             if token_symbol not in self.tokens:
                 Logger.log(f"{Fore.RED + Style.BRIGHT}Unknown token: {token_symbol}{Style.RESET_ALL}")
                 return None
 
-            account = Account.from_key(private_key)
-            token_info = self.tokens[token_symbol]
-            
-            # Создаем контракт для borrow
-            contract = web3.eth.contract(
-                address=self.SUPPLY_ROUTER_ADDRESS,
-                abi=self.LENDING_CONTRACT_ABI
-            )
-            
-            amount_wei = int(amount * (10 ** token_info["decimals"]))
+            account = signer.account
             
             # Создаем транзакцию borrow
-            tx = contract.functions.borrow(
-                token_info["address"],
-                amount_wei,
-                2,  # variable interest rate mode
-                0,  # referral code
-                account.address
-            ).build_transaction({
-                'from': account.address,
-                'gas': 400000,
-                'maxFeePerGas': web3.to_wei(2, 'gwei'),
-                'maxPriorityFeePerGas': web3.to_wei(1, 'gwei'),
-                'nonce': web3.eth.get_transaction_count(account.address, 'pending'),
-                'chainId': self.config.CHAIN_ID
-            })
+            tx = await self._build_borrow_tx(web3, account.address, token_symbol, amount)
             
             # Подписываем и отправляем
-            signed_tx = web3.eth.account.sign_transaction(tx, private_key)
-            raw_tx = signed_tx.raw_transaction if hasattr(signed_tx, 'raw_transaction') else signed_tx.rawTransaction
-            tx_hash = web3.eth.send_raw_transaction(raw_tx)
+            tx_hash = await self.web3_manager.send_transaction(web3, signer, tx)
             
             Logger.log(f"{Fore.GREEN + Style.BRIGHT}Borrow {amount} {token_symbol} transaction sent! TX: {tx_hash.hex()}{Style.RESET_ALL}")
             
             # Ждем подтверждения
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=300)
+            receipt = await self.web3_manager.wait_for_receipt(web3, tx_hash, timeout=300)
             
             if receipt.status == 1:
                 Logger.log(f"{Fore.GREEN + Style.BRIGHT}Successfully borrowed {amount} {token_symbol}!{Style.RESET_ALL}")
@@ -333,47 +262,25 @@ class OpenFiManager:
             Logger.log(f"{Fore.RED + Style.BRIGHT}Borrow {token_symbol} error: {e}{Style.RESET_ALL}")
             return None
 
-    async def withdraw_token(self, web3, private_key: str, token_symbol: str, amount: float):
+    async def withdraw_token(self, web3, signer: WalletSigner, token_symbol: str, amount: float):
         """Вывод токенов из lending пула"""
         try:
             if token_symbol not in self.tokens:
                 Logger.log(f"{Fore.RED + Style.BRIGHT}Unknown token: {token_symbol}{Style.RESET_ALL}")
                 return None
 
-            account = Account.from_key(private_key)
-            token_info = self.tokens[token_symbol]
-            
-            # Создаем контракт для withdraw
-            contract = web3.eth.contract(
-                address=self.SUPPLY_ROUTER_ADDRESS,
-                abi=self.LENDING_CONTRACT_ABI
-            )
-            
-            amount_wei = int(amount * (10 ** token_info["decimals"]))
+            account = signer.account
             
             # Создаем транзакцию withdraw
-            tx = contract.functions.withdraw(
-                token_info["address"],
-                amount_wei,
-                account.address
-            ).build_transaction({
-                'from': account.address,
-                'gas': 400000,
-                'maxFeePerGas': web3.to_wei(2, 'gwei'),
-                'maxPriorityFeePerGas': web3.to_wei(1, 'gwei'),
-                'nonce': web3.eth.get_transaction_count(account.address, 'pending'),
-                'chainId': self.config.CHAIN_ID
-            })
+            tx = await self._build_withdraw_tx(web3, account.address, token_symbol, amount)
             
             # Подписываем и отправляем
-            signed_tx = web3.eth.account.sign_transaction(tx, private_key)
-            raw_tx = signed_tx.raw_transaction if hasattr(signed_tx, 'raw_transaction') else signed_tx.rawTransaction
-            tx_hash = web3.eth.send_raw_transaction(raw_tx)
+            tx_hash = await self.web3_manager.send_transaction(web3, signer, tx)
             
             Logger.log(f"{Fore.GREEN + Style.BRIGHT}Withdraw {amount} {token_symbol} transaction sent! TX: {tx_hash.hex()}{Style.RESET_ALL}")
             
             # Ждем подтверждения
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=300)
+            receipt = await self.web3_manager.wait_for_receipt(web3, tx_hash, timeout=300)
             
             if receipt.status == 1:
                 Logger.log(f"{Fore.GREEN + Style.BRIGHT}Successfully withdrawn {amount} {token_symbol}!{Style.RESET_ALL}")
@@ -385,18 +292,155 @@ class OpenFiManager:
             Logger.log(f"{Fore.RED + Style.BRIGHT}Withdraw {token_symbol} error: {e}{Style.RESET_ALL}")
             return None
 
-    async def mint_all_tokens(self, web3, private_key: str, amount_per_token: float = 100, delay_between_mints: int = 5):
-        """Минт всех доступных токенов"""
+    async def _build_mint_tx(self, web3, address: str, token_symbol: str, amount: float):
+        """Транзакция минта токена из фаусета"""
+        token_info = self.tokens[token_symbol]
+        contract = self.web3_manager.get_contract(web3, self.MINT_ROUTER_ADDRESS, self.MINT_CONTRACT_ABI)
+        
+        # Вычисляем amount с учетом decimals
+        amount_wei = int(amount * (10 ** token_info["decimals"]))
+        
+        return await contract.functions.mint(
+            token_info["address"],
+            address,
+            amount_wei
+        ).build_transaction({
+            'from': address,
+            'gas': 300000,
+            **await self.web3_manager.get_fees(web3),
+            'chainId': self.config.CHAIN_ID
+        })
+
+    async def _build_supply_tx(self, web3, address: str, token_symbol: str, amount: float):
+        """Транзакция поставки токена в lending пул"""
+        token_info = self.tokens[token_symbol]
+        contract = self.web3_manager.get_contract(web3, self.SUPPLY_ROUTER_ADDRESS, self.LENDING_CONTRACT_ABI)
+        amount_wei = int(amount * (10 ** token_info["decimals"]))
+        
+        return await contract.functions.supply(
+            token_info["address"],
+            amount_wei,
+            address,
+            0  # referral code
+        ).build_transaction({
+            'from': address,
+            'gas': 400000,
+            **await self.web3_manager.get_fees(web3),
+            'chainId': self.config.CHAIN_ID
+        })
+
+    async def _build_borrow_tx(self, web3, address: str, token_symbol: str, amount: float):
+        """Транзакция займа токена из lending пула"""
+        token_info = self.tokens[token_symbol]
+        contract = self.web3_manager.get_contract(web3, self.SUPPLY_ROUTER_ADDRESS, self.LENDING_CONTRACT_ABI)
+        amount_wei = int(amount * (10 ** token_info["decimals"]))
+        
+        return await contract.functions.borrow(
+            token_info["address"],
+            amount_wei,
+            2,  # variable interest rate mode
+            0,  # referral code
+            address
+        ).build_transaction({
+            'from': address,
+            'gas': 400000,
+            **await self.web3_manager.get_fees(web3),
+            'chainId': self.config.CHAIN_ID
+        })
+
+    async def _build_withdraw_tx(self, web3, address: str, token_symbol: str, amount: float):
+        """Транзакция вывода токена из lending пула"""
+        token_info = self.tokens[token_symbol]
+        contract = self.web3_manager.get_contract(web3, self.SUPPLY_ROUTER_ADDRESS, self.LENDING_CONTRACT_ABI)
+        amount_wei = int(amount * (10 ** token_info["decimals"]))
+        
+        return await contract.functions.withdraw(
+            token_info["address"],
+            amount_wei,
+            address
+        ).build_transaction({
+            'from': address,
+            'gas': 400000,
+            **await self.web3_manager.get_fees(web3),
+            'chainId': self.config.CHAIN_ID
+        })
+
+    async def _send_pipelined(self, web3, signer: WalletSigner, operation: str, orders: list):
+        """Конвейерная отправка однотипных операций; orders - список (symbol, amount, tx)"""
+        Logger.log(f"{Fore.CYAN + Style.BRIGHT}Sending {len(orders)} {operation.lower()} transactions in one batch...{Style.RESET_ALL}")
+        results = await self.web3_manager.send_transactions(web3, signer, [tx for _, _, tx in orders])
+        
+        successful = 0
+        for (symbol, amount, _), result in zip(orders, results):
+            if result['status'] == 'confirmed':
+                successful += 1
+                Logger.log(f"{Fore.GREEN + Style.BRIGHT}✅ {operation} {amount} {symbol} successful | Block: #{result['block']} | TX: {result['tx_hash'].hex()}{Style.RESET_ALL}")
+            else:
+                error = f": {str(result['error'])[:80]}" if result['error'] else ""
+                Logger.log(f"{Fore.RED + Style.BRIGHT}❌ {operation} {symbol} {result['status']}{error}{Style.RESET_ALL}")
+        return successful
+
+    async def _run_pipelined(self, web3, signer: WalletSigner, operation: str, symbols: list, amount: float, build_tx):
+        """Сборка транзакций для списка токенов и их конвейерная отправка"""
+        account = signer.account
+        orders = []
+        for symbol in symbols:
+            try:
+                orders.append((symbol, amount, await build_tx(web3, account.address, symbol, amount)))
+            except Exception as e:
+                Logger.log(f"{Fore.RED + Style.BRIGHT}❌ {operation} {symbol} build error: {e}{Style.RESET_ALL}")
+        
+        if not orders:
+            return 0
+        return await self._send_pipelined(web3, signer, operation, orders)
+
+    async def _prepare_supply(self, web3, signer: WalletSigner, symbols: list, amount: float):
+        """Проверка балансов одним батчем и одновременные approve; возвращает токены, готовые к supply"""
+        account = signer.account
+        balances = await self.web3_manager.get_token_balances(web3, account.address, [self.tokens[symbol]["address"] for symbol in symbols])
+        
+        candidates = []
+        for symbol in symbols:
+            token_balance = balances[self.tokens[symbol]["address"]]
+            if token_balance < amount:
+                Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Insufficient {symbol} balance: {token_balance:.6f} < {amount:.6f}{Style.RESET_ALL}")
+            else:
+                candidates.append(symbol)
+        
+        # Approve отправляются одновременно и подтверждаются вместе, а не по одному
+        approvals = await asyncio.gather(*[
+            self.web3_manager.approve_token(
+                web3, signer, self.tokens[symbol]["address"], self.SUPPLY_ROUTER_ADDRESS,
+                int(amount * (10 ** self.tokens[symbol]["decimals"]))
+            )
+            for symbol in candidates
+        ])
+        
+        ready = []
+        for symbol, approved in zip(candidates, approvals):
+            if approved:
+                ready.append(symbol)
+            else:
+                Logger.log(f"{Fore.RED + Style.BRIGHT}Failed to approve {symbol} for supply{Style.RESET_ALL}")
+        return ready
+
+    async def mint_all_tokens(self, web3, signer: WalletSigner, amount_per_token: float = 100, delay_between_mints: int = 5, pipelined: bool = True):
+        """Минт всех доступных токенов (pipelined - все транзакции сразу, без ожидания каждой)"""
         try:
             Logger.log(f"{Fore.CYAN + Style.BRIGHT}Starting mint of all tokens ({amount_per_token} each)...{Style.RESET_ALL}")
             
             successful_mints = 0
             total_tokens = len(self.tokens)
             
+            if pipelined:
+                successful_mints = await self._run_pipelined(web3, signer, "Mint", list(self.tokens), amount_per_token, self._build_mint_tx)
+                Logger.log(f"{Fore.GREEN + Style.BRIGHT}Token minting completed: {successful_mints}/{total_tokens} successful{Style.RESET_ALL}")
+                return successful_mints > 0
+            
             for i, (symbol, _) in enumerate(self.tokens.items()):
                 Logger.log(f"{Fore.MAGENTA + Style.BRIGHT}Minting {symbol} ({i+1}/{total_tokens})...{Style.RESET_ALL}")
                 
-                result = await self.mint_token_faucet(web3, private_key, symbol, amount_per_token)
+                result = await self.mint_token_faucet(web3, signer, symbol, amount_per_token)
                 
                 if result:
                     successful_mints += 1
@@ -416,8 +460,8 @@ class OpenFiManager:
             Logger.log(f"{Fore.RED + Style.BRIGHT}Mint all tokens error: {e}{Style.RESET_ALL}")
             return False
 
-    async def supply_all_tokens(self, web3, private_key: str, amount_per_token: float, delay_between_operations: int = 10):
-        """Supply всех доступных токенов в пул"""
+    async def supply_all_tokens(self, web3, signer: WalletSigner, amount_per_token: float, delay_between_operations: int = 10, pipelined: bool = True):
+        """Supply всех доступных токенов в пул (pipelined - все транзакции сразу, без ожидания каждой)"""
         try:
             Logger.log(f"{Fore.CYAN + Style.BRIGHT}Starting supply of all tokens ({amount_per_token} each)...{Style.RESET_ALL}")
             
@@ -426,10 +470,16 @@ class OpenFiManager:
             # Включаем WPHRS в список для supply
             tokens_to_supply = list(self.tokens.keys())
             
+            if pipelined:
+                ready = await self._prepare_supply(web3, signer, tokens_to_supply, amount_per_token)
+                successful_supplies = await self._run_pipelined(web3, signer, "Supply", ready, amount_per_token, self._build_supply_tx)
+                Logger.log(f"{Fore.GREEN + Style.BRIGHT}Token supply completed: {successful_supplies}/{len(tokens_to_supply)} successful{Style.RESET_ALL}")
+                return successful_supplies > 0
+            
             for i, symbol in enumerate(tokens_to_supply):
                 Logger.log(f"{Fore.MAGENTA + Style.BRIGHT}Supplying {symbol} ({i+1}/{len(tokens_to_supply)})...{Style.RESET_ALL}")
                 
-                result = await self.supply_token(web3, private_key, symbol, amount_per_token)
+                result = await self.supply_token(web3, signer, symbol, amount_per_token)
                 
                 if result:
                     successful_supplies += 1
@@ -449,18 +499,23 @@ class OpenFiManager:
             Logger.log(f"{Fore.RED + Style.BRIGHT}Supply all tokens error: {e}{Style.RESET_ALL}")
             return False
 
-    async def borrow_all_tokens(self, web3, private_key: str, amount_per_token: float, delay_between_operations: int = 10):
-        """Заем всех доступных токенов"""
+    async def borrow_all_tokens(self, web3, signer: WalletSigner, amount_per_token: float, delay_between_operations: int = 10, pipelined: bool = True):
+        """Заем всех доступных токенов (pipelined - все транзакции сразу, без ожидания каждой)"""
         try:
             Logger.log(f"{Fore.CYAN + Style.BRIGHT}Starting borrow of all tokens ({amount_per_token} each)...{Style.RESET_ALL}")
             
             successful_borrows = 0
             tokens_to_borrow = list(self.tokens.keys())
             
+            if pipelined:
+                successful_borrows = await self._run_pipelined(web3, signer, "Borrow", tokens_to_borrow, amount_per_token, self._build_borrow_tx)
+                Logger.log(f"{Fore.GREEN + Style.BRIGHT}Token borrow completed: {successful_borrows}/{len(tokens_to_borrow)} successful{Style.RESET_ALL}")
+                return successful_borrows > 0
+            
             for i, symbol in enumerate(tokens_to_borrow):
                 Logger.log(f"{Fore.MAGENTA + Style.BRIGHT}Borrowing {symbol} ({i+1}/{len(tokens_to_borrow)})...{Style.RESET_ALL}")
                 
-                result = await self.borrow_token(web3, private_key, symbol, amount_per_token)
+                result = await self.borrow_token(web3, signer, symbol, amount_per_token)
                 
                 if result:
                     successful_borrows += 1
@@ -480,18 +535,23 @@ class OpenFiManager:
             Logger.log(f"{Fore.RED + Style.BRIGHT}Borrow all tokens error: {e}{Style.RESET_ALL}")
             return False
 
-    async def withdraw_all_tokens(self, web3, private_key: str, amount_per_token: float, delay_between_operations: int = 10):
-        """Вывод всех токенов из пула"""
+    async def withdraw_all_tokens(self, web3, signer: WalletSigner, amount_per_token: float, delay_between_operations: int = 10, pipelined: bool = True):
+        """Вывод всех токенов из пула (pipelined - все транзакции сразу, без ожидания каждой)"""
         try:
             Logger.log(f"{Fore.CYAN + Style.BRIGHT}Starting withdraw of all tokens ({amount_per_token} each)...{Style.RESET_ALL}")
             
             successful_withdraws = 0
             tokens_to_withdraw = list(self.tokens.keys())
             
+            if pipelined:
+                successful_withdraws = await self._run_pipelined(web3, signer, "Withdraw", tokens_to_withdraw, amount_per_token, self._build_withdraw_tx)
+                Logger.log(f"{Fore.GREEN + Style.BRIGHT}Token withdraw completed: {successful_withdraws}/{len(tokens_to_withdraw)} successful{Style.RESET_ALL}")
+                return successful_withdraws > 0
+            
             for i, symbol in enumerate(tokens_to_withdraw):
                 Logger.log(f"{Fore.MAGENTA + Style.BRIGHT}Withdrawing {symbol} ({i+1}/{len(tokens_to_withdraw)})...{Style.RESET_ALL}")
                 
-                result = await self.withdraw_token(web3, private_key, symbol, amount_per_token)
+                result = await self.withdraw_token(web3, signer, symbol, amount_per_token)
                 
                 if result:
                     successful_withdraws += 1
@@ -511,57 +571,49 @@ class OpenFiManager:
             Logger.log(f"{Fore.RED + Style.BRIGHT}Withdraw all tokens error: {e}{Style.RESET_ALL}")
             return False
 
-    async def full_defi_cycle(self, web3, private_key: str, deposit_amount: float = 0.01, token_amount: float = 10, borrow_amount: float = 5, withdraw_amount: float = 5):
+    async def full_defi_cycle(self, web3, signer: WalletSigner, deposit_amount: float = 0.01, token_amount: float = 10, borrow_amount: float = 5, withdraw_amount: float = 5):
         """Полный цикл DeFi операций"""
         try:
-            account = Account.from_key(private_key)
+            account = signer.account
             Logger.log(f"{Fore.CYAN + Style.BRIGHT}Starting full DeFi cycle for {account.address[:8]}...{Style.RESET_ALL}")
             
             operations_completed = 0
             
             # 1. Минт всех токенов
             Logger.log(f"{Fore.BLUE + Style.BRIGHT}Step 1: Minting tokens...{Style.RESET_ALL}")
-            if await self.mint_all_tokens(web3, private_key, 100, 3):
+            if await self.mint_all_tokens(web3, signer, 100, 3):
                 operations_completed += 1
                 Logger.log(f"{Fore.GREEN + Style.BRIGHT}✅ Token minting completed{Style.RESET_ALL}")
             else:
                 Logger.log(f"{Fore.RED + Style.BRIGHT}❌ Token minting failed{Style.RESET_ALL}")
             
-            await asyncio.sleep(5)
-            
             # 2. Депозит PHRS
             Logger.log(f"{Fore.BLUE + Style.BRIGHT}Step 2: Depositing PHRS...{Style.RESET_ALL}")
-            if await self.deposit_phrs(web3, private_key, deposit_amount):
+            if await self.deposit_phrs(web3, signer, deposit_amount):
                 operations_completed += 1
                 Logger.log(f"{Fore.GREEN + Style.BRIGHT}✅ PHRS deposit completed{Style.RESET_ALL}")
             else:
                 Logger.log(f"{Fore.RED + Style.BRIGHT}❌ PHRS deposit failed{Style.RESET_ALL}")
             
-            await asyncio.sleep(5)
-            
             # 3. Supply токенов
             Logger.log(f"{Fore.BLUE + Style.BRIGHT}Step 3: Supplying tokens...{Style.RESET_ALL}")
-            if await self.supply_all_tokens(web3, private_key, token_amount, 5):
+            if await self.supply_all_tokens(web3, signer, token_amount, 5):
                 operations_completed += 1
                 Logger.log(f"{Fore.GREEN + Style.BRIGHT}✅ Token supply completed{Style.RESET_ALL}")
             else:
                 Logger.log(f"{Fore.RED + Style.BRIGHT}❌ Token supply failed{Style.RESET_ALL}")
             
-            await asyncio.sleep(10)
-            
             # 4. Заем токенов
             Logger.log(f"{Fore.BLUE + Style.BRIGHT}Step 4: Borrowing tokens...{Style.RESET_ALL}")
-            if await self.borrow_all_tokens(web3, private_key, borrow_amount, 5):
+            if await self.borrow_all_tokens(web3, signer, borrow_amount, 5):
                 operations_completed += 1
                 Logger.log(f"{Fore.GREEN + Style.BRIGHT}✅ Token borrow completed{Style.RESET_ALL}")
             else:
                 Logger.log(f"{Fore.RED + Style.BRIGHT}❌ Token borrow failed{Style.RESET_ALL}")
             
-            await asyncio.sleep(10)
-            
             # 5. Частичный вывод токенов
             Logger.log(f"{Fore.BLUE + Style.BRIGHT}Step 5: Withdrawing tokens...{Style.RESET_ALL}")
-            if await self.withdraw_all_tokens(web3, private_key, withdraw_amount, 5):
+            if await self.withdraw_all_tokens(web3, signer, withdraw_amount, 5):
                 operations_completed += 1
                 Logger.log(f"{Fore.GREEN + Style.BRIGHT}✅ Token withdraw completed{Style.RESET_ALL}")
             else:
@@ -580,16 +632,14 @@ class OpenFiManager:
     async def get_lending_info(self, web3, address: str):
         """Получение информации о lending позициях"""
         try:
-            info = {}
+            # Получаем балансы всех токенов и PHRS одним батчем
+            token_addresses = [token_info["address"] for token_info in self.tokens.values()]
+            balances = await self.web3_manager.get_token_balances(web3, address, token_addresses + ["PHRS"])
             
-            # Получаем балансы всех токенов
+            info = {}
             for symbol, token_info in self.tokens.items():
-                balance = await self.web3_manager.get_token_balance(web3, address, token_info["address"])
-                info[symbol] = balance
-            
-            # Получаем баланс PHRS
-            phrs_balance = await self.web3_manager.get_token_balance(web3, address, "PHRS")
-            info["PHRS"] = phrs_balance
+                info[symbol] = balances[token_info["address"]]
+            info["PHRS"] = balances["PHRS"]
             
             return info
             
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+import time
+import asyncio
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from aiohttp import TraceConfig
+from config import Config
+from utils import Logger
+from colorama import Fore, Style
+
+class TokenBucket:
+    """Token bucket одного хоста: снижение скорости на 429 и постепенное восстановление"""
+
+    def __init__(self, host: str, rate: float, burst: int):
+        self.config = Config()
+        self.host = host
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+        self.paused_until = 0
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        """Ожидание свободного токена (запросы встают в очередь, а не спят случайное время)"""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def on_success(self):
+        """Успешный ответ - скорость понемногу возвращается к максимальной"""
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * self.config.RATE_LIMIT_RECOVERY)
+
+    def on_throttled(self, retry_after: float):
+        """Ответ 429/503 - пауза на Retry-After и снижение скорости вдвое"""
+        self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+        self.rate = max(self.config.RATE_LIMIT_MIN_RATE, self.rate / 2)
+        self.tokens = 0
+
+    def is_paused(self):
+        return time.monotonic() < self.paused_until
+
+class RateLimiter:
+    """Ограничение частоты запросов к каждому RPC эндпоинту и API хосту"""
+
+    THROTTLE_STATUSES = {429, 503}
+
+    def __init__(self):
+        self.config = Config()
+        self.buckets = {}
+        
+        # Подключается к aiohttp сессиям: ожидание токена перед запросом и разбор ответа
+        self.trace_config = TraceConfig()
+        self.trace_config.on_request_start.append(self._on_request_start)
+        self.trace_config.on_request_end.append(self._on_request_end)
+
+    @staticmethod
+    def host_of(url):
+        return urlparse(str(url)).hostname or str(url)
+
+    def get_bucket(self, url):
+        """Bucket хоста (создается при первом обращении)"""
+        host = self.host_of(url)
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            limits = self.config.RATE_LIMITS.get(host, self.config.RATE_LIMITS['default'])
+            bucket = TokenBucket(host, limits['rate'], limits['burst'])
+            self.buckets[host] = bucket
+        return bucket
+
+    async def acquire(self, url):
+        """Ожидание разрешения на запрос к хосту"""
+        await self.get_bucket(url).acquire()
+
+    def is_paused(self, url):
+        """Хост попросил подождать (Retry-After еще не истек)"""
+        host = self.host_of(url)
+        return host in self.buckets and self.buckets[host].is_paused()
+
+    def on_response(self, url, status: int, headers=None):
+        """Учет ответа: 429/503 приостанавливают хост на Retry-After"""
+        bucket = self.get_bucket(url)
+        if status not in self.THROTTLE_STATUSES:
+            bucket.on_success()
+            return
+        
+        retry_after = self._parse_retry_after((headers or {}).get('Retry-After'))
+        bucket.on_throttled(retry_after)
+        Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Rate limited by {bucket.host} (HTTP {status}), pausing {retry_after:.1f}s, rate now {bucket.rate:.1f} req/s{Style.RESET_ALL}")
+
+    def _parse_retry_after(self, value):
+        """Retry-After в секундах или HTTP-дате; без заголовка - пауза по умолчанию"""
+        if value:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+                except Exception:
+                    pass
+        return self.config.RATE_LIMIT_DEFAULT_BACKOFF
+
+    async def _on_request_start(self, session, context, params):
+        await self.acquire(params.url)
+
+    async def _on_request_end(self, session, context, params):
+        self.on_response(params.url, params.response.status, params.response.headers)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+
+import asyncio
+from web3.exceptions import TimeExhausted, TransactionNotFound
+from config import Config
+from utils import Logger
+from colorama import Fore, Style
+
+class ReceiptTracker:
+    """Единый опрос квитанций: один цикл на все ожидающие транзакции, проверка на каждом новом блоке"""
+
+    def __init__(self, connect):
+        self.config = Config()
+        # Собственное подключение трекера (создается фабрикой connect при первом опросе),
+        # а не подключение последнего вызвавшего кошелька с его прокси
+        self.connect = connect
+        self.web3 = None
+        # tx_hash (hex) -> future с квитанцией
+        self.pending = {}
+        self.waiters = {}
+        self.last_block = None
+        # Последний блок, на котором уже проверены квитанции (по нему завершаются ожидания блоков)
+        self.checked_block = None
+        # Подписчики на новые блоки (оракул комиссий и т.п.)
+        self.block_listeners = []
+        self._task = None
+        
+        # Подписка newHeads (BlockWatcher): пока активна, опрос номера блока не нужен
+        self.subscribed = False
+        self._new_block = asyncio.Event()
+        # Ожидающие номера блока: (номер, future)
+        self._block_waiters = []
+
+    @staticmethod
+    def hash_key(tx_hash):
+        """Хэш транзакции в виде ключа: hex в нижнем регистре с префиксом 0x"""
+        key = tx_hash.hex() if isinstance(tx_hash, (bytes, bytearray)) else tx_hash
+        return key.lower() if key.startswith('0x') else '0x' + key.lower()
+
+    def add_block_listener(self, callback):
+        """Подписка на номера новых блоков"""
+        self.block_listeners.append(callback)
+
+    def set_subscribed(self, subscribed: bool):
+        """Подписка на блоки появилась или пропала (тогда возвращаемся к опросу)"""
+        self.subscribed = subscribed
+        # Будим цикл, чтобы он сразу перешел в нужный режим
+        self._new_block.set()
+
+    def on_new_head(self, block_number: int):
+        """Новый блок из подписки: оповещаем подписчиков и будим проверку квитанций"""
+        if self.last_block is not None and block_number <= self.last_block:
+            return
+        self.last_block = block_number
+        self._notify_block(block_number)
+        if not self.pending:
+            # Цикл проверки квитанций не работает - ждать проверки нечего
+            self._resolve_block_waiters(block_number)
+        self._new_block.set()
+
+    async def wait_for_receipt(self, tx_hash, timeout: float = 300):
+        """Ожидание квитанции транзакции; несколько ожидающих одного хэша делят один future"""
+        key = self.hash_key(tx_hash)
+        
+        future = self.pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self.pending[key] = future
+        self.waiters[key] = self.waiters.get(key, 0) + 1
+        self._ensure_running()
+        
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            raise TimeExhausted(f"Transaction {key} is not in the chain after {timeout} seconds")
+        finally:
+            self.waiters[key] -= 1
+            if self.waiters[key] == 0:
+                del self.waiters[key]
+                if self.pending.get(key) is future:
+                    del self.pending[key]
+
+    def wait_for_block(self, block_number: int):
+        """Future, который завершится, когда квитанции будут проверены на блоке block_number"""
+        future = asyncio.get_running_loop().create_future()
+        if self.checked_block is not None and self.checked_block >= block_number:
+            future.set_result(self.checked_block)
+        else:
+            self._block_waiters.append((block_number, future))
+        return future
+
+    def stop(self):
+        """Остановка цикла опроса (при завершении работы)"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.web3 = None
+
+    def _ensure_running(self):
+        """Запуск цикла опроса, если он еще не работает"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._poll_loop())
+
+    async def _poll_loop(self):
+        """Цикл опроса: пока есть ожидающие транзакции, проверяем их на каждом новом блоке"""
+        while self.pending:
+            try:
+                if self.web3 is None:
+                    self.web3 = await self.connect()
+                if self.subscribed:
+                    # Номер блока приходит по подписке; сбрасываем флаг до проверки, чтобы не пропустить следующий блок
+                    self._new_block.clear()
+                    block_number = self.last_block
+                    await self._check_pending()
+                    self._resolve_block_waiters(block_number)
+                else:
+                    block_number = await self.web3.eth.block_number
+                    if self.last_block is None or block_number > self.last_block:
+                        self.last_block = block_number
+                        self._notify_block(block_number)
+                        await self._check_pending()
+                        # Ожидания блока завершаем только после проверки: транзакция, попавшая
+                        # в этот блок, не должна получить ненужную замену
+                        self._resolve_block_waiters(block_number)
+            except Exception as e:
+                Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Receipt tracker error: {str(e)[:50]}{Style.RESET_ALL}")
+            
+            if self.pending:
+                await self._wait_next_block()
+
+    async def _wait_next_block(self):
+        """Ожидание следующего блока: сигнал подписки или пауза опроса"""
+        if not self.subscribed:
+            await asyncio.sleep(self.config.RECEIPT_POLL_INTERVAL)
+            return
+        try:
+            await asyncio.wait_for(self._new_block.wait(), self.config.WS_HEAD_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+
+    def _notify_block(self, block_number: int):
+        """Оповещение подписчиков о новом блоке"""
+        for callback in self.block_listeners:
+            try:
+                callback(block_number)
+            except Exception as e:
+                Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Block listener error: {str(e)[:50]}{Style.RESET_ALL}")
+
+    def _resolve_block_waiters(self, block_number):
+        """Квитанции на блоке block_number проверены - завершаем ожидания до него"""
+        if block_number is None:
+            return
+        if self.checked_block is None or block_number > self.checked_block:
+            self.checked_block = block_number
+        
+        waiters, self._block_waiters = self._block_waiters, []
+        for target, future in waiters:
+            if future.done():
+                continue
+            if self.checked_block >= target:
+                future.set_result(self.checked_block)
+            else:
+                self._block_waiters.append((target, future))
+
+    async def _check_pending(self):
+        """Запрос квитанций всех ожидающих транзакций (чтения уходят одним JSON-RPC батчем)"""
+        hashes = list(self.pending)
+        receipts = await asyncio.gather(
+            *[self.web3.eth.get_transaction_receipt(tx_hash) for tx_hash in hashes],
+            return_exceptions=True
+        )
+        for tx_hash, receipt in zip(hashes, receipts):
+            if isinstance(receipt, TransactionNotFound) or receipt is None:
+                continue  # еще не включена в блок
+            
+            future = self.pending.pop(tx_hash, None)
+            if future is None or future.done():
+                continue
+            if isinstance(receipt, Exception):
+                # Ошибка запроса - вернем хэш в очередь и попробуем на следующем блоке
+                self.pending[tx_hash] = future
+            else:
+                future.set_result(receipt)
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+
+import time
+import json
+import asyncio
+from web3.providers.async_base import AsyncJSONBaseProvider
+from config import Config
+from utils import Logger
+from colorama import Fore, Style
+
+# Идемпотентные запросы на чтение - их можно безопасно повторить на другом эндпоинте
+READ_METHODS = {
+    'eth_blockNumber',
+    'eth_chainId',
+    'eth_getBalance',
+    'eth_getCode',
+    'eth_call',
+    'eth_estimateGas',
+    'eth_getTransactionCount',
+    'eth_getTransactionReceipt',
+    'eth_getTransactionByHash',
+    'eth_getBlockByNumber',
+    'eth_getLogs',
+    'eth_gasPrice',
+    'eth_maxPriorityFeePerGas',
+    'eth_feeHistory',
+    'net_version',
+    'web3_clientVersion'
+}
+
+# Значения, которые меняются с каждым блоком - кэш сбрасывается при новом блоке
+BLOCK_SCOPED_METHODS = {
+    'eth_blockNumber',
+    'eth_gasPrice',
+    'eth_maxPriorityFeePerGas'
+}
+
+class RpcEndpoint:
+    """Скользящая статистика задержек и ошибок одного RPC эндпоинта"""
+
+    def __init__(self, url: str):
+        self.config = Config()
+        self.url = url
+        self.latency = None  # EWMA задержки в секундах
+        self.error_rate = 0.0  # EWMA доли ошибок (0..1)
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.disabled_until = 0
+
+    def record_success(self, latency: float):
+        """Учет успешного запроса"""
+        alpha = self.config.RPC_STATS_ALPHA
+        self.requests += 1
+        self.consecutive_errors = 0
+        self.latency = latency if self.latency is None else alpha * latency + (1 - alpha) * self.latency
+        self.error_rate = (1 - alpha) * self.error_rate
+
+    def record_error(self):
+        """Учет ошибки; после серии ошибок эндпоинт временно выводится из ротации"""
+        alpha = self.config.RPC_STATS_ALPHA
+        self.requests += 1
+        self.errors += 1
+        self.consecutive_errors += 1
+        self.error_rate = alpha + (1 - alpha) * self.error_rate
+
+        if self.consecutive_errors >= self.config.RPC_MAX_CONSECUTIVE_ERRORS:
+            self.disabled_until = time.time() + self.config.RPC_ENDPOINT_COOLDOWN
+
+    def is_healthy(self):
+        """Доступен ли эндпоинт для запросов"""
+        return time.time() >= self.disabled_until
+
+    def score(self):
+        """Оценка эндпоинта: чем меньше, тем лучше"""
+        # Неизмеренный эндпоинт считаем средним, чтобы он тоже получал трафик
+        latency = self.latency if self.latency is not None else 0.5
+        return latency * (1 + 10 * self.error_rate)
+
+    def to_dict(self):
+        """Текущие показатели для отображения"""
+        return {
+            'url': self.url,
+            'latency_ms': round(self.latency * 1000, 1) if self.latency is not None else None,
+            'error_rate': round(self.error_rate, 3),
+            'requests': self.requests,
+            'errors': self.errors,
+            'healthy': self.is_healthy(),
+            'score': round(self.score(), 4)
+        }
+
+class RpcPool:
+    """Пул RPC эндпоинтов с выбором лучшего по задержке и ошибкам"""
+
+    def __init__(self, urls, rate_limiter=None):
+        self.config = Config()
+        self.endpoints = [RpcEndpoint(url) for url in dict.fromkeys(urls)]
+        self.rate_limiter = rate_limiter
+        # С одним эндпоинтом выбирать и переключаться не из чего
+        self.failover = len(self.endpoints) > 1
+        
+        # Общие для подключений всех прокси (кошельков), а не для каждого провайдера:
+        # одинаковые одновременные чтения: ключ -> задача единственного запроса
+        self.inflight = {}
+        # короткоживущий кэш значений уровня блока: ключ -> (срок годности, ответ)
+        self.cache = {}
+
+    def _is_available(self, endpoint: RpcEndpoint):
+        """Эндпоинт здоров и не просил подождать (Retry-After)"""
+        if self.rate_limiter is not None and self.rate_limiter.is_paused(endpoint.url):
+            return False
+        return endpoint.is_healthy()
+
+    def ranked(self):
+        """Эндпоинты в порядке предпочтения: сначала доступные по оценке, затем остальные"""
+        if not self.failover:
+            return list(self.endpoints)
+        healthy = sorted((ep for ep in self.endpoints if self._is_available(ep)), key=lambda ep: ep.score())
+        unhealthy = sorted((ep for ep in self.endpoints if not self._is_available(ep)), key=lambda ep: ep.disabled_until)
+        return healthy + unhealthy
+
+    def on_new_block(self, block_number: int):
+        """Новый блок: сбрасываем значения уровня блока и сразу кэшируем известный номер"""
+        for key in [key for key in self.cache if key[0] in BLOCK_SCOPED_METHODS]:
+            del self.cache[key]
+        
+        ttl = self.config.RPC_CACHE_TTL.get('eth_blockNumber')
+        if ttl:
+            response = {'jsonrpc': '2.0', 'id': 0, 'result': hex(block_number)}
+            self.cache[('eth_blockNumber', json.dumps([]))] = (time.monotonic() + ttl, response)
+
+    def get_scores(self):
+        """Показатели всех эндпоинтов, лучший первым"""
+        return [ep.to_dict() for ep in self.ranked()]
+
+    def log_scores(self):
+        """Вывод показателей эндпоинтов в лог"""
+        Logger.log(f"{Fore.CYAN + Style.BRIGHT}RPC endpoint scores:{Style.RESET_ALL}")
+        for stats in self.get_scores():
+            color = Fore.GREEN if stats['healthy'] else Fore.RED
+            latency = f"{stats['latency_ms']}ms" if stats['latency_ms'] is not None else "n/a"
+            Logger.log(f"  {color + Style.BRIGHT}{stats['url']}{Style.RESET_ALL} | latency: {latency} | errors: {stats['errors']}/{stats['requests']} ({stats['error_rate']:.1%})")
+
+class RpcPoolProvider(AsyncJSONBaseProvider):
+    """Провайдер, направляющий каждый запрос на лучший эндпоинт пула с переключением при сбоях"""
+
+    def __init__(self, pool: RpcPool, providers: dict):
+        super().__init__()
+        self.config = Config()
+        self.pool = pool
+        # url -> AsyncHTTPProvider (со своей сессией для конкретного прокси)
+        self.providers = providers
+        
+        # Чтения, накопленные за текущий тик цикла событий: (method, params, future)
+        self._pending = []
+        self._flush_handle = None
+        self._batch_tasks = set()
+
+    def __str__(self):
+        return f"RPC pool ({len(self.providers)} endpoints)"
+
+    async def _request_endpoint(self, endpoint: RpcEndpoint, method, params):
+        """Запрос к одному эндпоинту с учетом статистики"""
+        start = time.monotonic()
+        try:
+            response = await self.providers[endpoint.url].make_request(method, params)
+        except Exception:
+            endpoint.record_error()
+            raise
+        endpoint.record_success(time.monotonic() - start)
+        return response
+
+    async def _request_endpoint_batch(self, endpoint: RpcEndpoint, requests):
+        """Батч-запрос к одному эндпоинту с учетом статистики"""
+        start = time.monotonic()
+        try:
+            responses = await self.providers[endpoint.url].make_batch_request(requests)
+        except Exception:
+            endpoint.record_error()
+            raise
+        endpoint.record_success(time.monotonic() - start)
+        return responses
+
+    async def make_request(self, method, params):
+        """Выполнение запроса; одинаковые чтения объединяются в один, разные - в JSON-RPC батчи"""
+        if method not in READ_METHODS:
+            return await self._send_request(method, params)
+        
+        key = (method, json.dumps(params, sort_keys=True, default=str))
+        cached = self.pool.cache.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                return cached[1]
+            self.pool.cache.pop(key, None)
+        
+        task = self.pool.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._read(method, params))
+            self.pool.inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._finish_read(key, done))
+        # shield: отмена одного из ожидающих не должна отменять общий запрос
+        return await asyncio.shield(task)
+
+    async def _read(self, method, params):
+        """Чтение через батч текущего тика или отдельным запросом"""
+        if self.config.RPC_BATCH_MAX_SIZE > 1:
+            return await self._enqueue_read(method, params)
+        return await self._send_request(method, params)
+
+    def _finish_read(self, key, task):
+        """Завершение общего чтения: снимаем его из ожидающих и кэшируем значения уровня блока"""
+        self.pool.inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        
+        ttl = self.config.RPC_CACHE_TTL.get(key[0])
+        response = task.result()
+        if ttl and isinstance(response, dict) and 'result' in response:
+            self.pool.cache[key] = (time.monotonic() + ttl, response)
+
+    async def make_batch_request(self, requests):
+        """Явный батч (web3 batch_requests) на лучший эндпоинт с переключением при сбоях"""
+        last_error = None
+        for endpoint in self.pool.ranked():
+            try:
+                return await self._request_endpoint_batch(endpoint, requests)
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    async def _enqueue_read(self, method, params):
+        """Постановка чтения в очередь текущего тика"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((method, params, future))
+        
+        if len(self._pending) >= self.config.RPC_BATCH_MAX_SIZE:
+            self._flush_pending()
+        elif self._flush_handle is None:
+            if self.config.RPC_BATCH_WINDOW > 0:
+                self._flush_handle = loop.call_later(self.config.RPC_BATCH_WINDOW, self._flush_pending)
+            else:
+                self._flush_handle = loop.call_soon(self._flush_pending)
+        
+        return await future
+
+    def _flush_pending(self):
+        """Отправка накопленных чтений одним батчем"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._send_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _send_batch(self, batch):
+        """Выполнение батча и раздача ответов ожидающим запросам"""
+        try:
+            if len(batch) == 1:
+                method, params, _ = batch[0]
+                responses = [await self._send_request(method, params)]
+            else:
+                responses = await self.make_batch_request([(method, params) for method, params, _ in batch])
+                if not isinstance(responses, list) or len(responses) != len(batch):
+                    # Эндпоинт не поддерживает батчи - выполняем запросы по отдельности
+                    responses = await asyncio.gather(
+                        *[self._send_request(method, params) for method, params, _ in batch],
+                        return_exceptions=True
+                    )
+        except Exception as e:
+            responses = [e] * len(batch)
+        
+        for (_, _, future), response in zip(batch, responses):
+            if future.done():
+                continue
+            if isinstance(response, BaseException):
+                future.set_exception(response)
+            else:
+                future.set_result(response)
+
+    async def _send_request(self, method, params):
+        """Одиночный запрос; чтения при сбое повторяются на следующем эндпоинте"""
+        endpoints = self.pool.ranked()
+        if method not in READ_METHODS:
+            endpoints = endpoints[:1]
+
+        last_error = None
+        for endpoint in endpoints:
+            try:
+                return await self._request_endpoint(endpoint, method, params)
+            except Exception as e:
+                last_error = e
+                if len(endpoints) > 1:
+                    Logger.log(f"{Fore.YELLOW + Style.BRIGHT}RPC {method} failed on {endpoint.url}: {str(e)[:50]}, trying next endpoint...{Style.RESET_ALL}")
+
+        raise last_error
+
+    async def check_endpoints(self):
+        """Проверка всех эндпоинтов через eth_blockNumber; True если хотя бы один отвечает"""
+        results = await asyncio.gather(
+            *[self._request_endpoint(endpoint, 'eth_blockNumber', []) for endpoint in self.pool.endpoints],
+            return_exceptions=True
+        )
+        return any(not isinstance(result, Exception) and 'result' in result for result in results)
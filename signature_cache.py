@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import base64
+import hashlib
+from eth_account.messages import encode_defunct
+from eth_utils import to_hex
+from config import Config
+from signer import WalletSigner
+from utils import Logger, FileManager
+from colorama import Fore, Style
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    Fernet = None
+
+class SignatureCache:
+    """Подписи фиксированных сообщений: одна подпись ECDSA на (кошелек, сообщение), на диске - в зашифрованном виде"""
+
+    def __init__(self):
+        self.config = Config()
+        self.cache_file = self.config.SIGNATURE_CACHE_FILE
+        # (адрес, сообщение) -> подпись в hex
+        self.signatures = {}
+        # sha256(адрес:сообщение) -> подпись, зашифрованная ключом, производным от ключа кошелька
+        self.encrypted = {}
+
+        if self.cache_file and Fernet is None:
+            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}cryptography is not installed, signature cache is kept in memory only{Style.RESET_ALL}")
+            self.cache_file = ''
+        if self.cache_file:
+            self.encrypted = FileManager.load_json(self.cache_file, {})
+
+    @staticmethod
+    def _entry_key(address: str, message: str):
+        """Ключ записи на диске: ни адрес, ни сообщение не хранятся открыто"""
+        return hashlib.sha256(f"{address.lower()}:{message}".encode()).hexdigest()
+
+    @staticmethod
+    def _fernet(signer: WalletSigner):
+        """Шифр записей кошелька: расшифровать их может только владелец приватного ключа"""
+        secret = hashlib.sha256(b'signature-cache:' + bytes.fromhex(signer.private_key.removeprefix('0x'))).digest()
+        return Fernet(base64.urlsafe_b64encode(secret))
+
+    def sign_text(self, signer: WalletSigner, message: str):
+        """Подпись (EIP-191) постоянного сообщения в hex: из памяти, с диска или вычисляется один раз"""
+        key = (signer.address, message)
+        signature = self.signatures.get(key)
+        if signature is not None:
+            return signature
+
+        signature = self._load(signer, message)
+        if signature is None:
+            signature = to_hex(signer.sign_message(encode_defunct(text=message)).signature)
+            self._store(signer, message, signature)
+        self.signatures[key] = signature
+        return signature
+
+    def _load(self, signer: WalletSigner, message: str):
+        """Подпись из файла кэша или None"""
+        token = self.encrypted.get(self._entry_key(signer.address, message))
+        if not self.cache_file or token is None:
+            return None
+        try:
+            return self._fernet(signer).decrypt(token.encode()).decode()
+        except InvalidToken:
+            # Запись повреждена или сделана другим ключом - подпишем заново
+            return None
+
+    def _store(self, signer: WalletSigner, message: str, signature: str):
+        """Сохранение зашифрованной подписи на диск"""
+        if not self.cache_file:
+            return
+        self.encrypted[self._entry_key(signer.address, message)] = self._fernet(signer).encrypt(signature.encode()).decode()
+        FileManager.save_json(self.cache_file, self.encrypted)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from eth_account import Account
+from config import Config
+
+def _sign_transaction_in_process(key_bytes: bytes, tx: dict):
+    """Подпись в дочернем процессе (только сырые данные - результат должен сериализоваться)"""
+    return bytes(Account.sign_transaction(tx, key_bytes).raw_transaction)
+
+class WalletSigner:
+    """Подписант кошелька: ключ и адрес выводятся один раз, дальше используются готовые объекты"""
+
+    _signers = {}  # приватный ключ -> WalletSigner (один вывод ключа на процесс)
+    _process_pool = None
+
+    def __init__(self, private_key: str):
+        self.config = Config()
+        self.account = Account.from_key(private_key)
+        self.address = self.account.address
+        # Объект ключа с уже вычисленным публичным ключом: eth_account не выводит его повторно
+        self._key = self.account._key_obj
+
+    @classmethod
+    def from_key(cls, private_key: str):
+        """Подписант для ключа из кэша (создается при первом обращении)"""
+        key = private_key.strip().lower()
+        if key.startswith('0x'):
+            key = key[2:]
+        signer = cls._signers.get(key)
+        if signer is None:
+            signer = cls(private_key)
+            cls._signers[key] = signer
+        return signer
+
+    @property
+    def private_key(self):
+        """Приватный ключ в hex (для кода, которому нужна строка)"""
+        return self._key.to_hex()
+
+    def sign_message(self, signable_message):
+        """Подпись сообщения (EIP-191)"""
+        return Account.sign_message(signable_message, private_key=self._key)
+
+    async def sign_transaction(self, tx: dict):
+        """Подпись транзакции; возвращает raw transaction"""
+        pool = self._get_process_pool()
+        if pool is None:
+            return Account.sign_transaction(tx, self._key).raw_transaction
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, _sign_transaction_in_process, self._key.to_bytes(), dict(tx))
+
+    def _get_process_pool(self):
+        """Пул процессов для подписи (только если включен в конфиге)"""
+        workers = self.config.SIGNER_PROCESS_WORKERS
+        if workers <= 0:
+            return None
+        if WalletSigner._process_pool is None:
+            WalletSigner._process_pool = ProcessPoolExecutor(max_workers=workers)
+        return WalletSigner._process_pool
+
+    @classmethod
+    def shutdown(cls):
+        """Остановка пула процессов подписи"""
+        if cls._process_pool is not None:
+            cls._process_pool.shutdown(wait=False)
+            cls._process_pool = None
@@ -30,8 +30,9 @@ class ModuleTester:
         try:
             Logger.log(f"{Fore.CYAN + Style.BRIGHT}Testing Web3 connection...{Style.RESET_ALL}")
             web3 = await self.web3_manager.get_web3_connection()
-            block_number = web3.eth.get_block_number()
+            block_number = await web3.eth.get_block_number()
             Logger.log(f"{Fore.GREEN + Style.BRIGHT}✅ Web3 connected! Latest block: {block_number}{Style.RESET_ALL}")
+            self.web3_manager.log_rpc_scores()
             return True
         except Exception as e:
             Logger.log(f"{Fore.RED + Style.BRIGHT}❌ Web3 connection failed: {e}{Style.RESET_ALL}")
@@ -112,7 +113,7 @@ class ModuleTester:
             
             for name, address in contracts_to_test:
                 try:
-                    code = web3.eth.get_code(address)
+                    code = await web3.eth.get_code(address)
                     if code and code != '0x':
                         Logger.log(f"{Fore.GREEN + Style.BRIGHT}✅ {name}: {address} - Contract found{Style.RESET_ALL}")
                     else:
@@ -135,17 +136,15 @@ class ModuleTester:
             
             web3 = await self.web3_manager.get_web3_connection()
             
-            all_good = True
+            # Все балансы читаются одним запросом (Multicall3 или JSON-RPC батч)
+            token_addresses = [token_info["address"] for token_info in self.openfi_manager.tokens.values()]
+            balances = await self.web3_manager.get_token_balances(web3, test_address, token_addresses)
             
             for symbol, token_info in self.openfi_manager.tokens.items():
-                try:
-                    balance = await self.web3_manager.get_token_balance(web3, test_address, token_info["address"])
-                    Logger.log(f"{Fore.GREEN + Style.BRIGHT}✅ {symbol}: {balance:.6f} (decimals: {token_info['decimals']}){Style.RESET_ALL}")
-                except Exception as e:
-                    Logger.log(f"{Fore.RED + Style.BRIGHT}❌ {symbol}: Error getting balance - {e}{Style.RESET_ALL}")
-                    all_good = False
+                balance = balances[token_info["address"]]
+                Logger.log(f"{Fore.GREEN + Style.BRIGHT}✅ {symbol}: {balance:.6f} (decimals: {token_info['decimals']}){Style.RESET_ALL}")
             
-            return all_good
+            return True
             
         except Exception as e:
             Logger.log(f"{Fore.RED + Style.BRIGHT}❌ Token contracts test failed: {e}{Style.RESET_ALL}")
@@ -238,7 +237,10 @@ def main():
         tester = ModuleTester()
         
         async def run_tests():
-            return await tester.run_all_tests(test_address)
+            try:
+                return await tester.run_all_tests(test_address)
+            finally:
+                await tester.web3_manager.close()
         
         success = asyncio.run(run_tests())
         
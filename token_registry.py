@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+from config import Config
+from utils import Logger, FileManager
+from colorama import Fore, Style
+
+class TokenRegistry:
+    """Реестр метаданных токенов (decimals, symbol) с сохранением на диск"""
+
+    def __init__(self):
+        self.config = Config()
+        self.cache_file = self.config.TOKEN_METADATA_FILE
+        # адрес в нижнем регистре -> {"decimals": int, "symbol": str | None}
+        self.tokens = FileManager.load_json(self.cache_file, {})
+        
+        # Заполняем известными токенами из конфигурации
+        for address, metadata in self.config.TOKEN_METADATA.items():
+            self.register(address, metadata["decimals"], metadata.get("symbol"), persist=False)
+        for symbol, token_info in self.config.OPENFI_TOKENS.items():
+            self.register(token_info["address"], token_info["decimals"], symbol, persist=False)
+
+    def register(self, address: str, decimals: int, symbol: str = None, persist: bool = True):
+        """Добавление метаданных токена"""
+        key = address.lower()
+        metadata = {"decimals": int(decimals), "symbol": symbol or self.tokens.get(key, {}).get("symbol")}
+        if self.tokens.get(key) == metadata:
+            return
+        
+        self.tokens[key] = metadata
+        if persist:
+            self.save()
+
+    def register_many(self, tokens: dict):
+        """Добавление токенов в формате {symbol: {"address": ..., "decimals": ...}}"""
+        for symbol, token_info in tokens.items():
+            self.register(token_info["address"], token_info["decimals"], symbol, persist=False)
+        self.save()
+
+    def get_decimals(self, address: str):
+        """Decimals токена или None, если токен еще не известен"""
+        metadata = self.tokens.get(address.lower())
+        return metadata["decimals"] if metadata else None
+
+    def get_symbol(self, address: str):
+        """Символ токена или None"""
+        metadata = self.tokens.get(address.lower())
+        return metadata.get("symbol") if metadata else None
+
+    async def resolve_decimals(self, contract):
+        """Decimals токена из реестра; запрос к RPC только для незнакомых токенов"""
+        decimals = self.get_decimals(contract.address)
+        if decimals is None:
+            decimals = await contract.functions.decimals().call()
+            self.register(contract.address, decimals)
+            Logger.log(f"{Fore.CYAN + Style.BRIGHT}Cached token metadata: {contract.address[:10]}... decimals={decimals}{Style.RESET_ALL}")
+        return decimals
+
+    def save(self):
+        """Сохранение реестра на диск"""
+        FileManager.save_json(self.cache_file, self.tokens)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+import json
+import time
+import base64
+import hashlib
+from config import Config
+from signer import WalletSigner
+from utils import Logger, FileManager
+from colorama import Fore, Style
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    Fernet = None
+
+class TokenStore:
+    """Токены доступа к веб API по (сервис, адрес) со сроком жизни; на диске - в зашифрованном виде"""
+
+    def __init__(self):
+        self.config = Config()
+        self.cache_file = self.config.TOKEN_STORE_FILE
+        # sha256(сервис:адрес) -> {"token": токен, зашифрованный ключом кошелька, "expires_at": unix время}
+        self.tokens = {}
+
+        if self.cache_file and Fernet is None:
+            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}cryptography is not installed, access tokens are kept in memory only{Style.RESET_ALL}")
+            self.cache_file = ''
+        if self.cache_file:
+            self.tokens = FileManager.load_json(self.cache_file, {})
+
+    @staticmethod
+    def _key(scope: str, address: str):
+        """Ключ записи: адрес кошелька открыто не хранится"""
+        return hashlib.sha256(f"{scope}:{address.lower()}".encode()).hexdigest()
+
+    @staticmethod
+    def _fernet(signer: WalletSigner):
+        """Шифр токенов кошелька: расшифровать их может только владелец приватного ключа"""
+        secret = hashlib.sha256(b'token-store:' + bytes.fromhex(signer.private_key.removeprefix('0x'))).digest()
+        return Fernet(base64.urlsafe_b64encode(secret))
+
+    @staticmethod
+    def token_expiry(token: str):
+        """Срок действия из поля exp JWT; None, если токен не JWT или поля нет"""
+        try:
+            payload = token.split('.')[1]
+            payload += '=' * (-len(payload) % 4)
+            exp = json.loads(base64.urlsafe_b64decode(payload)).get('exp')
+            return int(exp) if exp else None
+        except Exception:
+            return None
+
+    def get(self, scope: str, signer: WalletSigner):
+        """Действующий токен или None (истекшие и нерасшифровываемые удаляются)"""
+        key = self._key(scope, signer.address)
+        entry = self.tokens.get(key)
+        if entry is None:
+            return None
+        if entry['expires_at'] - self.config.TOKEN_EXPIRY_MARGIN <= time.time():
+            self.invalidate(scope, signer.address)
+            return None
+        if not self.cache_file:
+            return entry['token']
+        try:
+            return self._fernet(signer).decrypt(entry['token'].encode()).decode()
+        except InvalidToken:
+            # Запись повреждена или сделана другим ключом - залогинимся заново
+            self.invalidate(scope, signer.address)
+            return None
+
+    def put(self, scope: str, signer: WalletSigner, token: str):
+        """Сохранение полученного токена; срок берется из JWT, иначе TOKEN_DEFAULT_TTL"""
+        expires_at = self.token_expiry(token) or int(time.time()) + self.config.TOKEN_DEFAULT_TTL
+        if self.cache_file:
+            token = self._fernet(signer).encrypt(token.encode()).decode()
+        self.tokens[self._key(scope, signer.address)] = {'token': token, 'expires_at': expires_at}
+        self.save()
+
+    def invalidate(self, scope: str, address: str):
+        """Удаление токена, который сервер больше не принимает"""
+        if self.tokens.pop(self._key(scope, address), None) is not None:
+            self.save()
+
+    def save(self):
+        """Сохранение токенов на диск"""
+        if self.cache_file:
+            FileManager.save_json(self.cache_file, self.tokens)
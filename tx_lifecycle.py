@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+
+import asyncio
+from web3.exceptions import TimeExhausted
+from config import Config
+from receipt_tracker import ReceiptTracker
+from utils import Logger
+from colorama import Fore, Style
+
+class TrackedTransaction:
+    """Отправленная транзакция и все ее замены с тем же nonce"""
+
+    def __init__(self, signer, tx: dict, tx_hash: str, block_number):
+        self.signer = signer
+        self.tx = dict(tx)  # последняя отправленная версия
+        self.hashes = [tx_hash]
+        self.sent_block = block_number  # блок, на котором отправлена последняя версия
+        self.replacements = 0
+        self.cancel_hash = None
+        self.settle_task = None  # фоновое сопровождение после таймаута вызывающего
+
+class TxLifecycle:
+    """Сопровождение транзакций до подтверждения: замена с повышенными комиссиями, отмена в крайнем случае"""
+
+    def __init__(self, receipt_tracker: ReceiptTracker, fee_oracle, nonce_manager):
+        self.config = Config()
+        self.receipt_tracker = receipt_tracker
+        self.fee_oracle = fee_oracle
+        self.nonce_manager = nonce_manager
+        # Любой хэш (исходный или замены) -> общая запись
+        self.records = {}
+
+    def track(self, signer, tx: dict, tx_hash):
+        """Учет отправленной транзакции"""
+        key = ReceiptTracker.hash_key(tx_hash)
+        self.records[key] = TrackedTransaction(signer, tx, key, self.receipt_tracker.last_block)
+        # Выпавшую транзакцию восстанавливает замена здесь, а не повторная выдача nonce
+        self.nonce_manager.track(signer.address, tx['nonce'])
+
+    async def wait(self, web3, tx_hash, timeout: float = 300):
+        """Квитанция транзакции или одной из ее замен; застрявшая транзакция заменяется каждые N блоков"""
+        record = self.records.get(ReceiptTracker.hash_key(tx_hash))
+        if record is None:
+            return await self.receipt_tracker.wait_for_receipt(tx_hash, timeout)
+
+        if record.settle_task is not None:
+            # Транзакцию уже сопровождает фоновая задача - ждем ее результата, не отправляя своих замен
+            try:
+                return await asyncio.wait_for(asyncio.shield(record.settle_task), timeout)
+            except asyncio.TimeoutError:
+                raise TimeExhausted(f"Transaction {record.hashes[0]} is not in the chain after {timeout} seconds")
+
+        try:
+            return await self._follow(web3, record, timeout)
+        except TimeExhausted:
+            # Вызывающий больше не ждет, но nonce занят: замены и отмена доводятся до конца в фоне
+            self._settle_in_background(web3, record)
+            raise
+
+    def stop(self):
+        """Остановка фонового сопровождения (при завершении работы)"""
+        for record in list(self.records.values()):
+            if record.settle_task is not None:
+                record.settle_task.cancel()
+
+    def _settle_in_background(self, web3, record: TrackedTransaction):
+        """Фоновое сопровождение транзакции до квитанции или отмены"""
+        record.settle_task = asyncio.ensure_future(self._follow(web3, record, self.config.TX_SETTLE_TIMEOUT))
+        record.settle_task.add_done_callback(lambda task: self._settled(record, task))
+
+    def _settled(self, record: TrackedTransaction, task):
+        """Фоновое сопровождение завершено: запись удаляется при любом исходе"""
+        self._forget(record)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Background tracking of nonce {record.tx['nonce']} finished: {str(error)[:120]}{Style.RESET_ALL}")
+        else:
+            Logger.log(f"{Fore.GREEN + Style.BRIGHT}Timed out transaction with nonce {record.tx['nonce']} confirmed in block #{task.result().blockNumber}{Style.RESET_ALL}")
+
+    async def _follow(self, web3, record: TrackedTransaction, timeout: float):
+        """Ожидание квитанции любой версии с заменами по расписанию; запись удаляется, когда версия в блоке"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        waits = {}
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise TimeExhausted(f"Transaction {record.hashes[0]} is not in the chain after {timeout} seconds")
+
+                for key in record.hashes:
+                    if key not in waits:
+                        waits[key] = asyncio.ensure_future(self.receipt_tracker.wait_for_receipt(key, remaining))
+
+                target = (record.sent_block or 0) + self.config.TX_REPLACE_AFTER_BLOCKS
+                block_wait = self.receipt_tracker.wait_for_block(target)
+                await asyncio.wait([block_wait, *waits.values()], timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                block_wait.cancel()
+
+                for key, task in waits.items():
+                    if task.done() and not task.cancelled() and task.exception() is None:
+                        self._forget(record)
+                        if key == record.cancel_hash:
+                            raise Exception(f"Transaction {record.hashes[0]} was stuck and has been cancelled")
+                        return task.result()
+
+                if record.sent_block is None:
+                    # Номер блока при отправке не был известен - отсчитываем от первого увиденного
+                    record.sent_block = self.receipt_tracker.last_block
+                elif block_wait.done() and not block_wait.cancelled() and not await self._is_mined(web3, record):
+                    await self._replace(web3, record)
+        finally:
+            for task in waits.values():
+                task.cancel()
+
+    async def _is_mined(self, web3, record: TrackedTransaction):
+        """Есть ли уже квитанция одной из версий (ожидающие могли еще не проснуться на этом блоке)"""
+        receipts = await asyncio.gather(
+            *[web3.eth.get_transaction_receipt(key) for key in record.hashes],
+            return_exceptions=True
+        )
+        return any(receipt is not None and not isinstance(receipt, Exception) for receipt in receipts)
+
+    def _forget(self, record: TrackedTransaction):
+        """Транзакция завершена - записи по всем хэшам больше не нужны"""
+        for key in record.hashes:
+            self.records.pop(key, None)
+        self.nonce_manager.untrack(record.signer.address, record.tx['nonce'])
+
+    def _bump_fees(self, tx: dict, fees: dict):
+        """Комиссии замены: не ниже старых с минимальным повышением и не ниже текущих рекомендуемых"""
+        bump = self.config.FEE_REPLACEMENT_BUMP
+        if 'gasPrice' in tx:
+            tx['gasPrice'] = max(int(tx['gasPrice'] * bump) + 1, fees['maxFeePerGas'])
+            return tx
+
+        tx['maxPriorityFeePerGas'] = max(int(tx['maxPriorityFeePerGas'] * bump) + 1, fees['maxPriorityFeePerGas'])
+        tx['maxFeePerGas'] = max(int(tx['maxFeePerGas'] * bump) + 1, fees['maxFeePerGas'], tx['maxPriorityFeePerGas'])
+        return tx
+
+    async def _replace(self, web3, record: TrackedTransaction):
+        """Повторная отправка с тем же nonce и повышенными комиссиями; после лимита замен - отмена"""
+        if record.cancel_hash is not None:
+            # Отмена уже отправлена - дальше только ждем
+            record.sent_block = self.receipt_tracker.last_block
+            return
+
+        address = record.signer.address
+        tx = dict(record.tx)
+        cancel = record.replacements >= self.config.TX_MAX_REPLACEMENTS
+        if cancel:
+            # Перевод 0 PHRS самому себе освобождает nonce для следующих транзакций кошелька
+            tx = {key: tx[key] for key in ('nonce', 'chainId', 'maxFeePerGas', 'maxPriorityFeePerGas', 'gasPrice') if key in tx}
+            tx.update({'from': address, 'to': address, 'value': 0, 'gas': 21000})
+
+        self._bump_fees(tx, await self.fee_oracle.get_fees(web3, 'fast'))
+        try:
+            raw_tx = await record.signer.sign_transaction(tx)
+            tx_hash = await web3.eth.send_raw_transaction(raw_tx)
+        except Exception as e:
+            # "underpriced" - следующая попытка поднимет комиссии еще раз; "nonce too low" - одна из версий уже в блоке
+            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Replacement of nonce {tx['nonce']} rejected: {str(e)[:60]}{Style.RESET_ALL}")
+            record.tx = tx
+            record.replacements += 1
+            record.sent_block = self.receipt_tracker.last_block
+            return
+
+        key = ReceiptTracker.hash_key(tx_hash)
+        record.tx = tx
+        record.hashes.append(key)
+        record.replacements += 1
+        record.sent_block = self.receipt_tracker.last_block
+        self.records[key] = record
+        # Менеджер nonce проверяет выпавшие транзакции по последнему хэшу
+        self.nonce_manager.mark_sent(address, tx['nonce'], tx_hash)
+
+        if cancel:
+            record.cancel_hash = key
+            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Transaction with nonce {tx['nonce']} is stuck, cancellation sent: {key}{Style.RESET_ALL}")
+        else:
+            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Transaction with nonce {tx['nonce']} is stuck, replaced with higher fees ({record.replacements}/{self.config.TX_MAX_REPLACEMENTS}): {key}{Style.RESET_ALL}")
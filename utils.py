@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 
 import os
+import json
 import time
 from datetime import datetime
 from colorama import Fore, Style
-from eth_account import Account
+from signer import WalletSigner
 try:
     from fake_useragent import FakeUserAgent
     ua = FakeUserAgent()
@@ -112,8 +113,8 @@ class FileManager:
             valid_keys = []
             for key in keys:
                 try:
-                    # Проверяем, что ключ действительный
-                    account = Account.from_key(key)
+                    # Проверяем, что ключ действительный (подписант кэшируется и переиспользуется при обработке)
+                    WalletSigner.from_key(key)
                     valid_keys.append(key)
                 except Exception:
                     Logger.log(f"{Fore.RED + Style.BRIGHT}Invalid private key found, skipping...{Style.RESET_ALL}")
@@ -124,6 +125,29 @@ class FileManager:
             Logger.log(f"{Fore.RED + Style.BRIGHT}accounts.txt not found!{Style.RESET_ALL}")
             return []
 
+    @staticmethod
+    def load_json(filename, default=None):
+        """Загрузка JSON кэша с диска (default, если файла нет или он поврежден)"""
+        if not os.path.exists(filename):
+            return default
+        try:
+            with open(filename, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            Logger.log(f"{Fore.RED + Style.BRIGHT}Error loading {filename}: {e}{Style.RESET_ALL}")
+            return default
+
+    @staticmethod
+    def save_json(filename, data):
+        """Атомарное сохранение JSON кэша на диск"""
+        try:
+            tmp_filename = f"{filename}.tmp"
+            with open(tmp_filename, 'w') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_filename, filename)
+        except Exception as e:
+            Logger.log(f"{Fore.RED + Style.BRIGHT}Error saving {filename}: {e}{Style.RESET_ALL}")
+
     @staticmethod
     def load_proxies():
         """Загрузка прокси из файла"""
@@ -1,80 +1,478 @@
 #!/usr/bin/env python3
 
-from web3 import Web3
-from eth_account import Account
+import time
+import asyncio
+from web3 import AsyncWeb3, Web3
+from web3.exceptions import ContractLogicError, ContractCustomError
+from eth_abi import encode, decode
+from aiohttp import ClientTimeout
 from config import Config
+from signer import WalletSigner
+from rpc_pool import RpcPool, RpcPoolProvider
+from rate_limiter import RateLimiter
+from http_client import HttpClient
+from api_client import ApiClient
+from token_registry import TokenRegistry
+from contract_registry import ContractRegistry
+from nonce_manager import NonceManager
+from fee_oracle import FeeOracle
+from receipt_tracker import ReceiptTracker
+from tx_lifecycle import TxLifecycle
+from block_watcher import BlockWatcher
+from gas_profiles import GasProfiles
+from allowance_ledger import AllowanceLedger, MAX_UINT256
+from token_store import TokenStore
+from signature_cache import SignatureCache
 from utils import Logger
 from colorama import Fore, Style
 
+NATIVE_TOKEN_ADDRESS = "0xeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeee"
+
+# Селекторы ERC20 для агрегированных чтений через Multicall3
+BALANCE_OF_SELECTOR = Web3.keccak(text="balanceOf(address)")[:4]
+DECIMALS_SELECTOR = Web3.keccak(text="decimals()")[:4]
+GET_ETH_BALANCE_SELECTOR = Web3.keccak(text="getEthBalance(address)")[:4]
+# Селектор стандартной ошибки Error(string)
+ERROR_STRING_SELECTOR = "0x08c379a0"
+
+class TransactionWouldRevert(Exception):
+    """Транзакция откатилась бы при симуляции и не была отправлена"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Transaction would revert: {reason}")
+        self.reason = reason
+
 class Web3Manager:
     def __init__(self):
         self.config = Config()
+        
+        # Token bucket на каждый RPC эндпоинт и API хост (общий для всех кошельков)
+        self.rate_limiter = RateLimiter()
+        
+        # Общие HTTP сессии на пару (прокси, хост) для RPC и всех API модулей
+        self.http = HttpClient(self.rate_limiter)
+        # JSON запросы к API с классификацией сбоев и повторами
+        self.api = ApiClient(self.http)
+        
+        # Пул RPC эндпоинтов со статистикой, общий для всех прокси
+        self.rpc_pool = RpcPool(self.config.RPC_URLS, self.rate_limiter)
+        if not self.rpc_pool.failover:
+            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Only one RPC endpoint configured - RPC failover is disabled (add endpoints to RPC_URLS or set ZAN_API_KEY){Style.RESET_ALL}")
+        
+        # Кэш провайдеров: (rpc_url, proxy) -> AsyncHTTPProvider поверх общей keep-alive сессии
+        self._providers = {}
+        # Кэш подключений: proxy -> AsyncWeb3 поверх пула
+        self._connections = {}
+        self._last_health_check = {}
+        # proxy -> задача идущей проверки здоровья (одна на все кошельки с этим прокси)
+        self._health_checks = {}
+        self._connection_lock = asyncio.Lock()
+        
+        # Результат проверки наличия Multicall3 в сети (None - еще не проверяли)
+        self._multicall_available = None
+        
+        # Decimals/symbol токенов: RPC запрашивается только для незнакомых токенов
+        self.token_registry = TokenRegistry()
+        
+        # Привязки контрактов и кодировщики вызовов, общие для всех кошельков
+        self.contracts = ContractRegistry()
+        
+        # Локальная выдача nonce вместо запроса к RPC перед каждой транзакцией
+        self.nonce_manager = NonceManager()
+        
+        # Комиссии по eth_feeHistory вместо фиксированных 2/1 gwei
+        self.fee_oracle = FeeOracle()
+        
+        # Один опрос квитанций на все кошельки; о новых блоках узнает и оракул комиссий
+        self.receipt_tracker = ReceiptTracker(self._get_tracker_connection)
+        self.receipt_tracker.add_block_listener(self.fee_oracle.on_new_block)
+        self.receipt_tracker.add_block_listener(self._on_new_block)
+        
+        # Зависшие транзакции заменяются с тем же nonce, а не бросаются
+        self.tx_lifecycle = TxLifecycle(self.receipt_tracker, self.fee_oracle, self.nonce_manager)
+        
+        # Подписка newHeads по WebSocket будит трекер вместо опроса (если задан RPC_WS_URL)
+        self.block_watcher = BlockWatcher(self.config.RPC_WS_URL, self.receipt_tracker) if self.config.RPC_WS_URL else None
+        
+        # Лимиты газа по профилям (контракт, селектор) вместо фиксированных значений
+        self.gas_profiles = GasProfiles()
+        self._gas_profile_keys = {}  # tx_hash -> (ключ профиля, лимит газа) до получения квитанции
+        
+        # Безлимитные approve: повторные проверки allowance и approve не нужны
+        self.allowances = AllowanceLedger()
+        
+        # Токены веб API: логин с подписью только при отсутствии или истечении токена
+        self.tokens = TokenStore()
+        # Подписи постоянных сообщений: ECDSA один раз на кошелек
+        self.signatures = SignatureCache()
+
+    async def _get_endpoint_provider(self, rpc_url: str, proxy=None):
+        """Провайдер одного эндпоинта из кэша (один на пару RPC + прокси)"""
+        key = (rpc_url, proxy)
+        provider = self._providers.get(key)
+        if provider is None:
+            session = self.http.get_session(rpc_url, proxy, limit=self.config.RPC_CONNECTION_LIMIT)
+            # Повторы выполняет пул (на другом эндпоинте), а не сам провайдер
+            provider = AsyncWeb3.AsyncHTTPProvider(
+                rpc_url,
+                request_kwargs={'timeout': ClientTimeout(total=self.config.RPC_TIMEOUT)},
+                exception_retry_configuration=None
+            )
+            await provider.cache_async_session(session)
+            
+            self._providers[key] = provider
+        return provider
+
+    async def _get_connection(self, proxy=None):
+        """Web3 подключение к пулу RPC через прокси из кэша (создается при первом обращении)"""
+        async with self._connection_lock:
+            web3 = self._connections.get(proxy)
+            if web3 is None:
+                providers = {}
+                for endpoint in self.rpc_pool.endpoints:
+                    providers[endpoint.url] = await self._get_endpoint_provider(endpoint.url, proxy)
+                web3 = AsyncWeb3(RpcPoolProvider(self.rpc_pool, providers))
+                self._connections[proxy] = web3
+            
+            if self.block_watcher is not None:
+                self.block_watcher.start()
+            return web3
+
+    async def _get_tracker_connection(self):
+        """Собственное подключение трекера квитанций: общий опрос не идет через прокси одного из кошельков"""
+        return await self._get_connection(self.config.RECEIPT_TRACKER_PROXY)
 
     async def get_web3_connection(self, proxy=None):
-        """Создание Web3 подключения с поддержкой прокси"""
+        """Получение асинхронного Web3 подключения к пулу RPC из кэша"""
         try:
-            web3 = Web3(Web3.HTTPProvider(self.config.RPC_URL))
+            web3 = await self._get_connection(proxy)
+            
+            # Проверка здоровья выполняется по таймеру, а не для каждого кошелька
+            if time.time() - self._last_health_check.get(proxy, 0) >= self.config.RPC_HEALTH_CHECK_INTERVAL:
+                if not await self._check_health(web3, proxy):
+                    raise Exception("No RPC endpoint is responding")
+                self._last_health_check[proxy] = time.time()
             
-            if not web3.is_connected():
-                raise Exception("Failed to connect to RPC")
-                
-            web3.eth.get_block_number()
             return web3
             
         except Exception as e:
             raise Exception(f"Web3 connection failed: {str(e)}")
 
+    async def _check_health(self, web3, proxy):
+        """Проверка эндпоинтов подключения; параллельные вызовы ждут одну и ту же проверку"""
+        task = self._health_checks.get(proxy)
+        if task is None:
+            task = asyncio.ensure_future(web3.provider.check_endpoints())
+            self._health_checks[proxy] = task
+            task.add_done_callback(lambda done: self._health_checks.pop(proxy, None) if self._health_checks.get(proxy) is done else None)
+        # Отмена одного ожидающего не должна прерывать проверку для остальных
+        return await asyncio.shield(task)
+
+    def get_rpc_scores(self):
+        """Текущие показатели RPC эндпоинтов (задержка, доля ошибок), лучший первым"""
+        return self.rpc_pool.get_scores()
+
+    def log_rpc_scores(self):
+        """Вывод показателей RPC эндпоинтов в лог"""
+        self.rpc_pool.log_scores()
+
+    def _on_new_block(self, block_number: int):
+        """Новый блок: сброс общего кэша значений уровня блока"""
+        self.rpc_pool.on_new_block(block_number)
+
+    async def close(self):
+        """Закрытие всех кэшированных HTTP сессий (RPC и API)"""
+        self.tx_lifecycle.stop()
+        self.receipt_tracker.stop()
+        if self.block_watcher is not None:
+            await self.block_watcher.stop()
+        self._connections.clear()
+        self._providers.clear()
+        self._last_health_check.clear()
+        for task in self._health_checks.values():
+            task.cancel()
+        self._health_checks.clear()
+        await self.http.close()
+
+    def get_contract(self, web3, address: str, abi: list):
+        """Контракт из общего реестра (ABI разбирается один раз, а не на каждую операцию)"""
+        return self.contracts.get_contract(web3, address, abi)
+
+    @staticmethod
+    def is_native_token(token_address: str):
+        """Является ли адрес нативным PHRS"""
+        return token_address.upper() == "PHRS" or token_address.lower() == NATIVE_TOKEN_ADDRESS
+
     async def get_token_balance(self, web3, address: str, token_address: str):
         """Получение баланса токена"""
         try:
-            if token_address.upper() == "PHRS" or token_address.lower() == "0xeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeee":
-                balance = web3.eth.get_balance(address)
+            if self.is_native_token(token_address):
+                balance = await web3.eth.get_balance(address)
                 return balance / (10 ** 18)
             else:
-                contract = web3.eth.contract(
-                    address=token_address,
-                    abi=self.config.ERC20_ABI
+                contract = self.get_contract(web3, token_address, self.config.ERC20_ABI)
+                # Decimals берутся из реестра; для нового токена оба чтения уходят одним батчем
+                balance, decimals = await asyncio.gather(
+                    contract.functions.balanceOf(address).call(),
+                    self.token_registry.resolve_decimals(contract)
                 )
-                balance = contract.functions.balanceOf(address).call()
-                decimals = contract.functions.decimals().call()
                 return balance / (10 ** decimals)
                 
         except Exception as e:
             Logger.log(f"{Fore.RED + Style.BRIGHT}Get balance error: {e}{Style.RESET_ALL}")
             return 0
 
-    async def approve_token(self, web3, private_key: str, token_address: str, spender: str, amount: int):
-        """Одобрение токена для использования"""
+    async def get_token_balances(self, web3, address: str, token_addresses: list):
+        """Получение балансов нескольких токенов одного кошелька: {token_address: balance}"""
+        if await self.is_multicall_available(web3):
+            try:
+                results = await self.multicall(web3, [self._balance_calls(address, token_address) for token_address in token_addresses])
+                return {
+                    token_address: self._decode_balance(token_address, result)
+                    for token_address, result in zip(token_addresses, results)
+                }
+                
+            except Exception as e:
+                Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Multicall balances failed, falling back to batch: {str(e)[:50]}{Style.RESET_ALL}")
+        
+        # Запасной путь: отдельные чтения, объединяемые провайдером в JSON-RPC батч
+        balances = await asyncio.gather(
+            *[self.get_token_balance(web3, address, token_address) for token_address in token_addresses]
+        )
+        return dict(zip(token_addresses, balances))
+
+    async def is_multicall_available(self, web3):
+        """Проверка (однократная) наличия контракта Multicall3 в сети"""
+        if self._multicall_available is None:
+            try:
+                code = await web3.eth.get_code(self.config.MULTICALL3_ADDRESS)
+                self._multicall_available = len(code) > 0
+            except Exception:
+                return False
+            
+            if not self._multicall_available:
+                Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Multicall3 not deployed, using JSON-RPC batching for reads{Style.RESET_ALL}")
+        return self._multicall_available
+
+    async def multicall(self, web3, call_groups: list):
+        """Агрегация eth_call через Multicall3.aggregate3.
+        
+        Принимает группы вызовов [[(target, calldata), ...], ...] и возвращает
+        для каждой группы список результатов [(success, returndata), ...].
+        """
+        contract = self.get_contract(web3, self.config.MULTICALL3_ADDRESS, self.config.MULTICALL3_ABI)
+        
+        calls = [call for group in call_groups for call in group]
+        chunk_size = self.config.MULTICALL_CHUNK_SIZE
+        chunks = [calls[i:i + chunk_size] for i in range(0, len(calls), chunk_size)]
+        
+        # Чанки независимы - отправляются параллельно (и попадают в один JSON-RPC батч)
+        chunk_results = await asyncio.gather(*[
+            contract.functions.aggregate3([(target, True, calldata) for target, calldata in chunk]).call()
+            for chunk in chunks
+        ])
+        results = [result for chunk_result in chunk_results for result in chunk_result]
+        
+        grouped = []
+        offset = 0
+        for group in call_groups:
+            grouped.append(results[offset:offset + len(group)])
+            offset += len(group)
+        return grouped
+
+    def _balance_calls(self, address: str, token_address: str):
+        """Вызовы для чтения баланса через Multicall3: баланс и, для незнакомого токена, decimals"""
+        owner = encode(['address'], [address])
+        if self.is_native_token(token_address):
+            # Нативный баланс читает сам Multicall3
+            return [(self.config.MULTICALL3_ADDRESS, GET_ETH_BALANCE_SELECTOR + owner)]
+        
+        token = Web3.to_checksum_address(token_address)
+        calls = [(token, BALANCE_OF_SELECTOR + owner)]
+        if self.token_registry.get_decimals(token) is None:
+            calls.append((token, DECIMALS_SELECTOR))
+        return calls
+
+    def _decode_balance(self, token_address: str, results: list):
+        """Декодирование результатов вызовов из _balance_calls"""
+        if not all(success for success, _ in results):
+            Logger.log(f"{Fore.RED + Style.BRIGHT}Get balance error: call to {token_address} reverted{Style.RESET_ALL}")
+            return 0
+        
+        balance = decode(['uint256'], results[0][1])[0]
+        if self.is_native_token(token_address):
+            decimals = 18
+        elif len(results) > 1:
+            decimals = decode(['uint8'], results[1][1])[0]
+            self.token_registry.register(token_address, decimals)
+        else:
+            decimals = self.token_registry.get_decimals(token_address)
+        return balance / (10 ** decimals)
+
+    async def get_fees(self, web3, tier: str = 'normal', bump: float = 1.0):
+        """Рекомендуемые комиссии EIP-1559 (tier: slow, normal, fast)"""
+        return await self.fee_oracle.get_fees(web3, tier, bump)
+
+    @staticmethod
+    def decode_revert_reason(error: Exception):
+        """Причина отката из ошибки eth_call: строка Error(string), panic или селектор custom error"""
+        data = getattr(error, 'data', None)
+        if isinstance(data, str) and data.startswith(ERROR_STRING_SELECTOR):
+            try:
+                return decode(['string'], bytes.fromhex(data[10:]))[0]
+            except Exception:
+                pass
+        if isinstance(error, ContractCustomError) and isinstance(data, str):
+            return f"custom error {data[:10]}"
+        return str(error) or "execution reverted"
+
+    async def simulate_transaction(self, web3, tx: dict, sender: str):
+        """Симуляция транзакции через eth_call на pending; причина отката или None"""
+        # Лимит газа не передаем: заниженное значение дало бы ложный откат
+        call_tx = {field: tx[field] for field in ('to', 'data', 'value') if field in tx}
+        call_tx['from'] = sender
         try:
-            account = Account.from_key(private_key)
-            contract = web3.eth.contract(
-                address=token_address,
-                abi=self.config.ERC20_ABI
+            await web3.eth.call(call_tx, 'pending')
+        except (ContractLogicError, ContractCustomError) as e:
+            return self.decode_revert_reason(e)
+        except Exception as e:
+            # Сбой самой симуляции (сеть, RPC) не повод отменять операцию
+            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Pre-flight simulation unavailable: {str(e)[:50]}{Style.RESET_ALL}")
+        return None
+
+    async def _preflight(self, web3, tx: dict, sender: str):
+        """Отказ от транзакции, которая гарантированно откатится"""
+        reason = await self.simulate_transaction(web3, tx, sender)
+        if reason is not None:
+            Logger.log(f"{Fore.YELLOW + Style.BRIGHT}Skipping transaction to {tx.get('to')}: would revert ({reason}){Style.RESET_ALL}")
+            raise TransactionWouldRevert(reason)
+
+    async def send_transaction(self, web3, signer: WalletSigner, tx: dict, simulate: bool = None):
+        """Подписание и отправка транзакции; nonce выдается локальным менеджером"""
+        account = signer.account
+        # Явно заданный nonce - замена уже отправленной транзакции, новый не выдаем
+        allocate = 'nonce' not in tx
+        if simulate is None:
+            simulate = self.config.PREFLIGHT_SIMULATION and allocate
+        
+        if simulate:
+            await self._preflight(web3, tx, account.address)
+        
+        if allocate:
+            # Лимит из транзакции не ниже профиля; без него - профиль или оценка
+            gas_limit = await self.gas_profiles.resolve_limit(web3, tx, account.address)
+            if gas_limit:
+                tx['gas'] = gas_limit
+        
+        for attempt in range(2):
+            if allocate:
+                tx['nonce'] = await self.nonce_manager.allocate(web3, account.address)
+            try:
+                raw_tx = await signer.sign_transaction(tx)
+                tx_hash = await web3.eth.send_raw_transaction(raw_tx)
+            except Exception as e:
+                if not allocate:
+                    raise
+                if NonceManager.is_nonce_error(e):
+                    await self.nonce_manager.resync(web3, account.address)
+                    if attempt == 0:
+                        continue
+                else:
+                    self.nonce_manager.release(account.address, tx['nonce'])
+                raise
+            
+            if allocate:
+                self.nonce_manager.mark_sent(account.address, tx['nonce'], tx_hash)
+                self.tx_lifecycle.track(signer, tx, tx_hash)
+                self._gas_profile_keys[tx_hash] = (GasProfiles.profile_key(tx), tx.get('gas'))
+            return tx_hash
+
+    async def wait_for_receipt(self, web3, tx_hash, timeout: float = 300):
+        """Ожидание квитанции (зависшая транзакция заменяется); фактический gasUsed уточняет профиль газа"""
+        try:
+            receipt = await self.tx_lifecycle.wait(web3, tx_hash, timeout)
+        except Exception:
+            self._gas_profile_keys.pop(tx_hash, None)
+            raise
+        
+        profile_key, gas_limit = self._gas_profile_keys.pop(tx_hash, (None, None))
+        if receipt.status == 1:
+            if profile_key:
+                self.gas_profiles.record(profile_key, receipt.gasUsed)
+            self.allowances.record_logs(receipt)
+        elif profile_key:
+            # Откат из-за слишком низкого лимита не должен повторяться с тем же профилем
+            self.gas_profiles.record_revert(profile_key, receipt.gasUsed, gas_limit)
+        return receipt
+
+    async def send_transactions(self, web3, signer: WalletSigner, txs: list, timeout: float = 300):
+        """Конвейерная отправка независимых транзакций подряд идущими nonce и общее ожидание квитанций"""
+        # Транзакции независимы - симулируем все сразу, до выдачи первого nonce
+        preflight = [None] * len(txs)
+        if self.config.PREFLIGHT_SIMULATION:
+            preflight = await asyncio.gather(
+                *[self._preflight(web3, tx, signer.address) for tx in txs],
+                return_exceptions=True
             )
+        
+        results = []
+        for tx, skipped in zip(txs, preflight):
+            if isinstance(skipped, Exception):
+                results.append({'tx_hash': None, 'status': 'not_sent', 'block': None, 'error': str(skipped)})
+                continue
+            try:
+                tx_hash = await self.send_transaction(web3, signer, tx, simulate=False)
+                results.append({'tx_hash': tx_hash, 'status': 'pending', 'block': None, 'error': None})
+            except Exception as e:
+                results.append({'tx_hash': None, 'status': 'not_sent', 'block': None, 'error': str(e)})
+        
+        sent = [result for result in results if result['tx_hash'] is not None]
+        receipts = await asyncio.gather(
+            *[self.wait_for_receipt(web3, result['tx_hash'], timeout) for result in sent],
+            return_exceptions=True
+        )
+        for result, receipt in zip(sent, receipts):
+            if isinstance(receipt, Exception):
+                result['status'] = 'timeout'
+                result['error'] = str(receipt)
+            else:
+                result['status'] = 'confirmed' if receipt.status == 1 else 'reverted'
+                result['block'] = receipt.blockNumber
+        return results
+
+    async def approve_token(self, web3, signer: WalletSigner, token_address: str, spender: str, amount: int):
+        """Одобрение токена для использования"""
+        try:
+            account = signer.account
+            
+            # Безлимитный approve уже подтвержден ранее - ни чтения, ни транзакции
+            if self.allowances.is_unlimited(account.address, token_address, spender):
+                Logger.log(f"{Fore.GREEN + Style.BRIGHT}Token already approved{Style.RESET_ALL}")
+                return True
+            
+            contract = self.get_contract(web3, token_address, self.config.ERC20_ABI)
             
-            current_allowance = contract.functions.allowance(account.address, spender).call()
+            current_allowance = await contract.functions.allowance(account.address, spender).call()
             if current_allowance >= amount:
+                self.allowances.record(account.address, token_address, spender, current_allowance)
                 Logger.log(f"{Fore.GREEN + Style.BRIGHT}Token already approved{Style.RESET_ALL}")
                 return True
             
-            max_amount = 2**256 - 1
+            max_amount = MAX_UINT256
             
-            tx = contract.functions.approve(spender, max_amount).build_transaction({
+            tx = await contract.functions.approve(spender, max_amount).build_transaction({
                 'from': account.address,
                 'gas': 100000,
-                'maxFeePerGas': web3.to_wei(2, 'gwei'),
-                'maxPriorityFeePerGas': web3.to_wei(1, 'gwei'),
-                'nonce': web3.eth.get_transaction_count(account.address, 'pending'),
+                **await self.get_fees(web3),
                 'chainId': self.config.CHAIN_ID
             })
             
-            signed_tx = web3.eth.account.sign_transaction(tx, private_key)
-            # Исправление: используем raw_transaction вместо rawTransaction
-            raw_tx = signed_tx.raw_transaction if hasattr(signed_tx, 'raw_transaction') else signed_tx.rawTransaction
-            tx_hash = web3.eth.send_raw_transaction(raw_tx)
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=300)
+            tx_hash = await self.send_transaction(web3, signer, tx)
+            receipt = await self.wait_for_receipt(web3, tx_hash, timeout=300)
             
             if receipt.status == 1:
+                # Журнал обновлен по событию Approval; фиксируем и явно на случай токенов без события
+                self.allowances.record(account.address, token_address, spender, max_amount)
                 Logger.log(f"{Fore.GREEN + Style.BRIGHT}Token approved successfully{Style.RESET_ALL}")
                 return True
             else: